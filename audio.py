@@ -0,0 +1,165 @@
+import struct
+from typing import Optional, Tuple
+import numpy as np
+
+# Whisper expects mono float32 samples in [-1, 1] at 16 kHz
+WHISPER_SAMPLE_RATE = 16000
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_ALAW = 0x0006
+WAVE_FORMAT_MULAW = 0x0007
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def _build_mulaw_table() -> np.ndarray:
+    """G.711 mu-law byte -> linear sample in [-1, 1]"""
+    codes = ~np.arange(256, dtype=np.int32) & 0xFF
+    sign = codes & 0x80
+    exponent = (codes >> 4) & 0x07
+    mantissa = codes & 0x0F
+    magnitude = (((mantissa << 3) + 0x84) << exponent) - 0x84
+    return (np.where(sign, -magnitude, magnitude) / 32768.0).astype(np.float32)
+
+
+def _build_alaw_table() -> np.ndarray:
+    """G.711 A-law byte -> linear sample in [-1, 1]"""
+    codes = np.arange(256, dtype=np.int32) ^ 0x55
+    sign = codes & 0x80
+    exponent = (codes >> 4) & 0x07
+    mantissa = codes & 0x0F
+    magnitude = np.where(
+        exponent == 0,
+        (mantissa << 4) + 8,
+        ((mantissa << 4) + 0x108) << np.maximum(exponent - 1, 0)
+    )
+    return (np.where(sign, magnitude, -magnitude) / 32768.0).astype(np.float32)
+
+
+MULAW_TABLE = _build_mulaw_table()
+ALAW_TABLE = _build_alaw_table()
+
+
+def mulaw_decode(data: bytes) -> np.ndarray:
+    """Decode 8-bit mu-law bytes (e.g. Twilio media frames) to float32 samples"""
+    return MULAW_TABLE[np.frombuffer(data, dtype=np.uint8)]
+
+
+def mulaw_encode(audio: np.ndarray) -> bytes:
+    """Encode float32 samples in [-1, 1] to 8-bit mu-law bytes"""
+    samples = np.clip(audio * 32768.0, -32635, 32635).astype(np.int32)
+    sign = np.where(samples < 0, 0x80, 0)
+    magnitude = np.abs(samples) + 0x84
+    exponent = np.floor(np.log2(magnitude)).astype(np.int32) - 7
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8).tobytes()
+
+
+def pcm16_decode(data: bytes) -> np.ndarray:
+    """Decode little-endian 16-bit PCM bytes to float32 samples"""
+    return np.frombuffer(data[:len(data) - len(data) % 2], dtype="<i2").astype(np.float32) / 32768.0
+
+
+def _lowpass_taps(cutoff: float, half_width: int = 32) -> np.ndarray:
+    """Hamming-windowed sinc FIR; ``cutoff`` in cycles per sample (0-0.5)"""
+    n = np.arange(-half_width, half_width + 1)
+    taps = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(len(n))
+    return (taps / taps.sum()).astype(np.float32)
+
+
+def resample(audio: np.ndarray, orig_rate: int, target_rate: int = WHISPER_SAMPLE_RATE) -> np.ndarray:
+    """Resample mono audio, band-limited when scipy is available"""
+    if orig_rate == target_rate or len(audio) == 0:
+        return audio.astype(np.float32, copy=False)
+    try:
+        from math import gcd
+        from scipy.signal import resample_poly
+        divisor = gcd(orig_rate, target_rate)
+        return resample_poly(audio, target_rate // divisor, orig_rate // divisor).astype(np.float32)
+    except ImportError:
+        # Linear interpolation fallback; when downsampling, first low-pass below
+        # the new Nyquist frequency so higher frequencies do not alias into speech
+        if target_rate < orig_rate:
+            taps = _lowpass_taps(target_rate / (2.0 * orig_rate))
+            # Centered slice of the full convolution: same length as the input
+            # even when the clip is shorter than the filter
+            delay = (len(taps) - 1) // 2
+            audio = np.convolve(audio, taps)[delay:delay + len(audio)]
+        duration = len(audio) / orig_rate
+        target_length = int(round(duration * target_rate))
+        positions = np.arange(target_length) * (orig_rate / target_rate)
+        return np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+
+
+def _parse_wav(data: bytes) -> Optional[Tuple[int, int, int, int, memoryview]]:
+    """(format_tag, channels, sample_rate, bits_per_sample, samples) of a RIFF/WAVE blob"""
+    if len(data) < 12 or data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        return None
+
+    view = memoryview(data)
+    fmt = None
+    offset = 12
+    while offset + 8 <= len(data):
+        chunk_id = data[offset:offset + 4]
+        (chunk_size,) = struct.unpack_from("<I", data, offset + 4)
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            # Truncated header: let the caller fall back to ffmpeg
+            if chunk_size < 16 or body + 16 > len(data):
+                return None
+            format_tag, channels, sample_rate = struct.unpack_from("<HHI", data, body)
+            (bits,) = struct.unpack_from("<H", data, body + 14)
+            if format_tag == WAVE_FORMAT_EXTENSIBLE and chunk_size >= 40:
+                if body + 26 > len(data):
+                    return None
+                # The real format is the first two bytes of the SubFormat GUID
+                (format_tag,) = struct.unpack_from("<H", data, body + 24)
+            fmt = (format_tag, channels, sample_rate, bits)
+        elif chunk_id == b"data" and fmt is not None:
+            # Streaming writers may leave the size unset; take what is there
+            end = min(body + chunk_size, len(data)) if chunk_size else len(data)
+            return fmt + (view[body:end],)
+        # Chunks are word aligned
+        offset = body + chunk_size + (chunk_size & 1)
+    return None
+
+
+def decode_wav(data: bytes, target_rate: int = WHISPER_SAMPLE_RATE) -> Optional[np.ndarray]:
+    """Decode WAV bytes in memory to mono float32 at ``target_rate``
+
+    Handles PCM (8/16/24/32-bit), IEEE float, mu-law and A-law. Returns None
+    for anything else (MP3, compressed WAV, ...) so callers can fall back to ffmpeg.
+    """
+    parsed = _parse_wav(data)
+    if parsed is None:
+        return None
+    format_tag, channels, sample_rate, bits, samples = parsed
+    if channels < 1 or sample_rate <= 0:
+        return None
+
+    raw = bytes(samples)
+    if format_tag == WAVE_FORMAT_PCM and bits == 16:
+        audio = pcm16_decode(raw)
+    elif format_tag == WAVE_FORMAT_PCM and bits == 8:
+        audio = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif format_tag == WAVE_FORMAT_PCM and bits == 24:
+        triples = np.frombuffer(raw[:len(raw) - len(raw) % 3], dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        values = triples[:, 0] | (triples[:, 1] << 8) | (triples[:, 2] << 16)
+        values = np.where(values & 0x800000, values - 0x1000000, values)
+        audio = values.astype(np.float32) / 8388608.0
+    elif format_tag == WAVE_FORMAT_PCM and bits == 32:
+        audio = np.frombuffer(raw[:len(raw) - len(raw) % 4], dtype="<i4").astype(np.float32) / 2147483648.0
+    elif format_tag == WAVE_FORMAT_IEEE_FLOAT and bits in (32, 64):
+        dtype = "<f4" if bits == 32 else "<f8"
+        audio = np.frombuffer(raw[:len(raw) - len(raw) % (bits // 8)], dtype=dtype).astype(np.float32)
+    elif format_tag == WAVE_FORMAT_MULAW and bits == 8:
+        audio = mulaw_decode(raw)
+    elif format_tag == WAVE_FORMAT_ALAW and bits == 8:
+        audio = ALAW_TABLE[np.frombuffer(raw, dtype=np.uint8)]
+    else:
+        return None
+
+    if channels > 1:
+        audio = audio[:len(audio) - len(audio) % channels].reshape(-1, channels).mean(axis=1)
+
+    return resample(audio, sample_rate, target_rate)
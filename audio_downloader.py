@@ -0,0 +1,130 @@
+import asyncio
+import random
+import threading
+from typing import Optional, Tuple
+from urllib.parse import urlparse
+import httpx
+from config import STT_CONFIG, TWILIO_CONFIG
+
+# Worth retrying: throttling and transient upstream failures
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class AudioDownloadError(Exception):
+    """Raised when a recording cannot be fetched"""
+
+
+class AudioDownloader:
+    """Async recording fetcher on a pooled keep-alive HTTP client
+
+    One client (and its connection pool) is shared by every download, bodies
+    are read in chunks with a size cap, and transient failures are retried
+    with exponential backoff.
+    """
+
+    def __init__(self,
+                 timeout: float = 10.0,
+                 connect_timeout: float = 3.0,
+                 retries: int = 3,
+                 backoff: float = 0.5,
+                 max_connections: int = 20,
+                 max_bytes: int = 25 * 1024 * 1024,
+                 chunk_size: int = 64 * 1024,
+                 auth: Optional[Tuple[str, str]] = None):
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections
+        )
+        self.retries = retries
+        self.backoff = backoff
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.auth = auth
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Shared client, recreated only if the event loop changed"""
+        loop = asyncio.get_event_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self.limits,
+                follow_redirects=True
+            )
+            self._client_loop = loop
+        return self._client
+
+    def _auth_for(self, url: str) -> Optional[Tuple[str, str]]:
+        # Only send account credentials to Twilio itself
+        host = urlparse(url).hostname or ""
+        if self.auth and (host == "twilio.com" or host.endswith(".twilio.com")):
+            return self.auth
+        return None
+
+    async def download(self, url: str) -> bytes:
+        """Fetch a recording, retrying transient failures"""
+        client = self._get_client()
+        last_error: Optional[Exception] = None
+
+        for attempt in range(self.retries + 1):
+            if attempt:
+                # Exponential backoff with jitter between attempts
+                await asyncio.sleep(self.backoff * (2 ** (attempt - 1)) * (1 + random.random() / 2))
+            try:
+                return await self._fetch(client, url)
+            except httpx.HTTPStatusError as e:
+                last_error = e
+                if e.response.status_code not in RETRYABLE_STATUS_CODES:
+                    break
+            except httpx.TransportError as e:
+                # Connect/read timeouts, refused or dropped connections
+                last_error = e
+
+        raise AudioDownloadError(f"Failed to download {url}: {last_error}")
+
+    async def _fetch(self, client: httpx.AsyncClient, url: str) -> bytes:
+        auth = self._auth_for(url)
+        request_kwargs = {"auth": auth} if auth else {}
+        async with client.stream("GET", url, **request_kwargs) as response:
+            response.raise_for_status()
+            chunks = []
+            size = 0
+            async for chunk in response.aiter_bytes(self.chunk_size):
+                size += len(chunk)
+                if size > self.max_bytes:
+                    raise AudioDownloadError(f"Recording exceeds {self.max_bytes} bytes: {url}")
+                chunks.append(chunk)
+            return b"".join(chunks)
+
+    async def aclose(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+
+_shared_downloader: Optional[AudioDownloader] = None
+_shared_lock = threading.Lock()
+
+
+def get_audio_downloader() -> AudioDownloader:
+    """Process-wide downloader built from STT_CONFIG"""
+    global _shared_downloader
+    if _shared_downloader is None:
+        with _shared_lock:
+            if _shared_downloader is None:
+                auth = None
+                if TWILIO_CONFIG['account_sid'] and TWILIO_CONFIG['auth_token']:
+                    auth = (TWILIO_CONFIG['account_sid'], TWILIO_CONFIG['auth_token'])
+                _shared_downloader = AudioDownloader(
+                    timeout=STT_CONFIG['download_timeout'],
+                    connect_timeout=STT_CONFIG['download_connect_timeout'],
+                    retries=STT_CONFIG['download_retries'],
+                    backoff=STT_CONFIG['download_backoff'],
+                    max_connections=STT_CONFIG['download_max_connections'],
+                    max_bytes=STT_CONFIG['download_max_bytes'],
+                    chunk_size=STT_CONFIG['download_chunk_size'],
+                    auth=auth
+                )
+    return _shared_downloader
@@ -0,0 +1,92 @@
+"""Benchmark: per-answer KeyphraseCountVectorizer.fit vs KeyphraseExtractor
+
+Builds a synthetic 1,000-answer corpus and times:
+  * the old path, refitting KeyphraseCountVectorizer on every answer
+  * the new path, ranking noun phrases from an already parsed Doc
+  * the new path including its spaCy parse (no Doc shared with other stages)
+
+Run from the project root:
+    python -m benchmarks.bench_keyphrases
+"""
+import random
+import statistics
+import time
+
+import spacy
+from keyphrase_vectorizers import KeyphraseCountVectorizer
+
+from keyphrase_extractor import KeyphraseExtractor
+
+CORPUS_SIZE = 1000
+
+OPENERS = [
+    "I have {years} years of experience in {field}.",
+    "My key skills are {skill}, {skill} and {skill}.",
+    "I worked as a {role} at a {company} where I built {thing}.",
+    "Most recently I led a small team building {thing} with {skill}.",
+    "I'm based in {city} and I can join within {weeks} weeks.",
+]
+FIELDS = ["backend development", "data engineering", "mobile development", "cloud infrastructure"]
+SKILLS = ["Python", "React", "AWS", "Docker", "Kubernetes", "Java", "machine learning", "agile delivery"]
+ROLES = ["senior software engineer", "technical lead", "data analyst", "site reliability engineer"]
+COMPANIES = ["large retail company", "fintech startup", "healthcare provider", "logistics firm"]
+THINGS = ["real-time payment systems", "internal reporting dashboards", "scalable REST APIs",
+          "customer onboarding flows"]
+CITIES = ["New York", "San Francisco", "Austin", "Seattle"]
+
+
+def _answer(rng: random.Random) -> str:
+    sentences = rng.sample(OPENERS, 3)
+    return " ".join(
+        sentence.format(
+            years=rng.randint(1, 15), field=rng.choice(FIELDS), skill=rng.choice(SKILLS),
+            role=rng.choice(ROLES), company=rng.choice(COMPANIES), thing=rng.choice(THINGS),
+            city=rng.choice(CITIES), weeks=rng.randint(1, 8)
+        )
+        for sentence in sentences
+    )
+
+
+def _report(label: str, timings: list) -> None:
+    print(f"{label:>28}: mean {statistics.mean(timings):7.3f} ms  "
+          f"p95 {sorted(timings)[int(len(timings) * 0.95)]:7.3f} ms  "
+          f"total {sum(timings) / 1000:6.2f} s")
+
+
+def main() -> None:
+    rng = random.Random(42)
+    corpus = [_answer(rng) for _ in range(CORPUS_SIZE)]
+    nlp = spacy.load("en_core_web_sm")
+
+    # Offline step: DF table from the corpus (timed separately, done once)
+    start = time.perf_counter()
+    docs = list(nlp.pipe(corpus, batch_size=64))
+    extractor = KeyphraseExtractor.build(docs)
+    print(f"DF table: {len(extractor.df)} phrases built in {time.perf_counter() - start:.2f} s (one-off)")
+
+    old = []
+    for text in corpus:
+        start = time.perf_counter()
+        KeyphraseCountVectorizer().fit([text]).get_feature_names_out()
+        old.append((time.perf_counter() - start) * 1000)
+
+    shared_doc = []
+    for doc in docs:
+        start = time.perf_counter()
+        extractor.extract(doc)
+        shared_doc.append((time.perf_counter() - start) * 1000)
+
+    with_parse = []
+    for text in corpus:
+        start = time.perf_counter()
+        extractor.extract(nlp(text))
+        with_parse.append((time.perf_counter() - start) * 1000)
+
+    _report("vectorizer fit per answer", old)
+    _report("extractor, shared Doc", shared_doc)
+    _report("extractor incl. spaCy parse", with_parse)
+    print(f"speedup with shared Doc: {statistics.mean(old) / statistics.mean(shared_doc):.0f}x")
+
+
+if __name__ == "__main__":
+    main()
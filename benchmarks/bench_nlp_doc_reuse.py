@@ -0,0 +1,66 @@
+"""Micro-benchmark: spaCy parses per transcript in NLPAnalyzer.analyze
+
+Compares the old path, where entity extraction and candidate-info extraction
+each parsed the transcript, with the shared AnalysisContext that parses once.
+
+Run from the project root:
+    python -m benchmarks.bench_nlp_doc_reuse
+"""
+import statistics
+import time
+
+from nlp_analysis import AnalysisContext, NLPAnalyzer
+
+TRANSCRIPTS = [
+    "Hi, I'm John Smith. I have 5 years of experience in software development "
+    "at companies in New York and Boston, mostly building Python services on AWS.",
+    "My key skills are Python, React, and Cloud technologies. I led a team of six "
+    "engineers at Acme Corp and we migrated our platform to Kubernetes last year.",
+    "I'm based in San Francisco, but I'm happy to relocate to Seattle or Austin "
+    "for the right role. I can join within 2 weeks of receiving an offer.",
+]
+
+ROUNDS = 200
+
+
+def _double_parse(analyzer: NLPAnalyzer, text: str) -> None:
+    """Previous behaviour: one parse per spaCy stage"""
+    analyzer._extract_entities(AnalysisContext(text, analyzer.nlp))
+    analyzer._extract_candidate_info(AnalysisContext(text, analyzer.nlp))
+
+
+def _single_parse(analyzer: NLPAnalyzer, text: str) -> None:
+    """Current behaviour: one parse shared by all spaCy stages"""
+    context = AnalysisContext(text, analyzer.nlp)
+    analyzer._extract_entities(context)
+    analyzer._extract_candidate_info(context)
+
+
+def _time(stage, analyzer: NLPAnalyzer) -> list:
+    timings = []
+    for _ in range(ROUNDS):
+        for text in TRANSCRIPTS:
+            start = time.perf_counter()
+            stage(analyzer, text)
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main() -> None:
+    analyzer = NLPAnalyzer()
+    # Warm up the spaCy pipeline before timing
+    _single_parse(analyzer, TRANSCRIPTS[0])
+
+    before = _time(_double_parse, analyzer)
+    after = _time(_single_parse, analyzer)
+
+    for label, timings in (("double parse", before), ("single parse", after)):
+        print(f"{label:>13}: mean {statistics.mean(timings):.3f} ms  "
+              f"median {statistics.median(timings):.3f} ms per transcript")
+    saved = statistics.mean(before) - statistics.mean(after)
+    print(f"latency cut: {saved:.3f} ms per transcript "
+          f"({saved / statistics.mean(before) * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Benchmark: Whisper micro-batching across concurrent calls
+
+Submits the same burst of concurrent utterances with batching disabled
+(max_batch_size=1) and enabled, and prints the scheduler metrics for each.
+
+Run from the project root (WAV files optional, synthetic tones otherwise):
+    python -m benchmarks.bench_stt_batching [--model base] [--calls 16] [file.wav ...]
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from audio import WHISPER_SAMPLE_RATE, decode_wav
+from speech_to_text import SpeechToText, TranscriptionScheduler, get_stt_backend
+
+
+def _load_audio(paths, calls):
+    if paths:
+        clips = []
+        for path in paths:
+            with open(path, "rb") as f:
+                audio = decode_wav(f.read())
+            if audio is None:
+                raise SystemExit(f"{path}: not a WAV file this benchmark can decode")
+            clips.append(audio)
+    else:
+        t = np.arange(int(4 * WHISPER_SAMPLE_RATE)) / WHISPER_SAMPLE_RATE
+        clips = [(0.2 * np.sin(2 * np.pi * (180 + 20 * i) * t)).astype(np.float32) for i in range(4)]
+    return [clips[i % len(clips)] for i in range(calls)]
+
+
+async def _burst(model_name: str, max_batch_size: int, utterances) -> dict:
+    # A private scheduler per run: the shared one keeps the first batch size it was built with
+    scheduler = TranscriptionScheduler(get_stt_backend(model_name), max_batch_size=max_batch_size, max_wait_ms=50)
+    start = time.perf_counter()
+    await asyncio.gather(*[scheduler.transcribe(audio) for audio in utterances])
+    metrics = scheduler.metrics()
+    metrics["wall_seconds"] = round(time.perf_counter() - start, 2)
+    return metrics
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--calls", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("files", nargs="*")
+    args = parser.parse_args()
+
+    utterances = _load_audio(args.files, args.calls)
+    SpeechToText(args.model).model  # Load outside the timed runs
+    await _burst(args.model, 1, utterances[:1])  # Warm up
+
+    for batch_size in (1, args.batch_size):
+        metrics = await _burst(args.model, batch_size, utterances)
+        print(f"max_batch_size={batch_size}: " + ", ".join(f"{k}={v}" for k, v in metrics.items()))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+"""Benchmark harness: real-time factor per STT engine and model size
+
+Transcribes a fixed local audio set with every engine/model combination and
+reports the real-time factor (processing time / audio duration; below 1.0 is
+faster than real time). Use the same WAV set between runs so numbers compare.
+
+Run from the project root:
+    python -m benchmarks.bench_stt_rtf path/to/wavs \\
+        --engines whisper faster-whisper --models tiny base small
+"""
+import argparse
+import os
+import statistics
+import time
+
+from audio import WHISPER_SAMPLE_RATE, decode_wav
+from stt_backends import STT_ENGINES, get_backend
+
+
+def _load_audio_set(directory: str):
+    clips = []
+    for name in sorted(os.listdir(directory)):
+        if not name.lower().endswith(".wav"):
+            continue
+        with open(os.path.join(directory, name), "rb") as f:
+            audio = decode_wav(f.read())
+        if audio is not None and len(audio):
+            clips.append((name, audio))
+    if not clips:
+        raise SystemExit(f"No decodable WAV files in {directory}")
+    return clips
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("audio_dir")
+    parser.add_argument("--engines", nargs="+", default=list(STT_ENGINES), choices=STT_ENGINES)
+    parser.add_argument("--models", nargs="+", default=["tiny", "base", "small"])
+    parser.add_argument("--compute-type", default="int8", help="faster-whisper quantization")
+    args = parser.parse_args()
+
+    clips = _load_audio_set(args.audio_dir)
+    total_audio = sum(len(audio) for _, audio in clips) / WHISPER_SAMPLE_RATE
+    print(f"{len(clips)} clips, {total_audio:.1f} s of audio\n")
+    print(f"{'engine':<16}{'model':<10}{'load s':>8}{'mean RTF':>10}{'p95 RTF':>10}{'total RTF':>11}")
+
+    for engine in args.engines:
+        for model_name in args.models:
+            backend = get_backend(engine, model_name, compute_type=args.compute_type)
+            try:
+                start = time.perf_counter()
+                backend.model
+                load_seconds = time.perf_counter() - start
+                backend.transcribe(clips[0][1])  # Warm up
+            except Exception as e:
+                print(f"{engine:<16}{model_name:<10}  skipped: {e}")
+                continue
+
+            factors = []
+            busy = 0.0
+            for _, audio in clips:
+                start = time.perf_counter()
+                backend.transcribe(audio)
+                elapsed = time.perf_counter() - start
+                busy += elapsed
+                factors.append(elapsed / (len(audio) / WHISPER_SAMPLE_RATE))
+
+            factors.sort()
+            print(f"{engine:<16}{model_name:<10}{load_seconds:>8.1f}{statistics.mean(factors):>10.3f}"
+                  f"{factors[int(len(factors) * 0.95)]:>10.3f}{busy / total_audio:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Benchmark harness: time to first audio byte, whole-clip vs streaming synthesis
+
+Synthesizes multi-sentence prompts with FakeTTSClient, whose latency grows
+with the input length like the real API, and reports when the first byte and
+the last byte of audio are available with ``synthesize`` (one request for the
+whole prompt) and ``synthesize_stream`` (one request per sentence, sent as
+soon as each is ready).
+
+Run from the project root:
+    python -m benchmarks.bench_tts_ttfb --sentences 6 --latency-per-char 0.002
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from config import TTS_CONFIG
+from mock_services import FakeTTSClient
+from text_to_speech import TextToSpeech
+
+SENTENCES = [
+    "Thank you for taking the time to speak with us today.",
+    "This interview has a few short questions about your background.",
+    "Please answer each one in your own words after the tone.",
+    "There are no right or wrong answers, so take your time.",
+    "If you need a question repeated, just stay silent for a moment.",
+    "Your answers are recorded and reviewed by our hiring team.",
+    "We will get back to you within a few business days.",
+    "Let us begin with the first question."
+]
+
+
+async def _whole(tts: TextToSpeech, text: str):
+    start = time.perf_counter()
+    await tts.synthesize(text)
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed
+
+
+async def _streamed(tts: TextToSpeech, text: str):
+    start = time.perf_counter()
+    first = None
+    async for _ in tts.synthesize_stream(text):
+        if first is None:
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+async def _run(args) -> None:
+    # No cache, so every run goes upstream
+    TTS_CONFIG['cache_enabled'] = False
+    tts = TextToSpeech(
+        client=FakeTTSClient(latency=args.latency, latency_per_char=args.latency_per_char),
+    )
+    print(f"{'mode':<10}{'sentences':>10}{'TTFB ms':>10}{'total ms':>10}")
+    for count in range(1, args.sentences + 1):
+        text = " ".join((SENTENCES * (count // len(SENTENCES) + 1))[:count])
+        for mode, run in (("whole", _whole), ("stream", _streamed)):
+            firsts, totals = [], []
+            for _ in range(args.repeat):
+                first, total = await run(tts, text)
+                firsts.append(first * 1000)
+                totals.append(total * 1000)
+            print(f"{mode:<10}{count:>10}{statistics.median(firsts):>10.1f}{statistics.median(totals):>10.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sentences", type=int, default=6, help="longest prompt, in sentences")
+    parser.add_argument("--latency", type=float, default=0.05, help="fixed seconds per upstream request")
+    parser.add_argument("--latency-per-char", type=float, default=0.002, help="seconds per input character")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
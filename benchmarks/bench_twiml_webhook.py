@@ -0,0 +1,92 @@
+"""Benchmark harness: question-flow webhook throughput, per-request vs precompiled TwiML
+
+Serves the handle-response webhook from a FastAPI app in two ways, building
+and serializing a VoiceResponse on every hit (the previous behaviour) and
+returning the TwiML bytes CallHandler renders once, and reports requests per
+second through the ASGI stack and for the TwiML step alone. Session
+bookkeeping is left out so only the TwiML cost is compared.
+
+Run from the project root:
+    python -m benchmarks.bench_twiml_webhook --requests 5000
+"""
+import argparse
+import asyncio
+import os
+import time
+
+# The Twilio client is never used for requests here, but needs credentials to build
+os.environ.setdefault("TWILIO_ACCOUNT_SID", "AC" + "0" * 32)
+os.environ.setdefault("TWILIO_AUTH_TOKEN", "benchmark")
+
+import httpx
+from fastapi import FastAPI, Response
+from twilio.twiml.voice_response import VoiceResponse
+
+from call_handler import CallHandler
+
+
+def _build_app(handler: CallHandler) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/dynamic/handle-response")
+    async def dynamic(question: int) -> Response:
+        if question >= len(handler.questions):
+            twiml = handler._generate_goodbye_twiml()
+        else:
+            twiml = handler._ask_next_question(VoiceResponse(), question + 1)
+        return Response(content=twiml, media_type="application/xml")
+
+    @app.post("/cached/handle-response")
+    async def cached(question: int) -> Response:
+        if question >= len(handler.questions):
+            twiml = handler._cached_twiml("goodbye")
+        else:
+            twiml = handler._cached_twiml(question + 1)
+        return Response(content=twiml, media_type="application/xml")
+
+    return app
+
+
+async def _webhook_rps(client: httpx.AsyncClient, mode: str, requests: int, questions: int) -> float:
+    start = time.perf_counter()
+    for i in range(requests):
+        response = await client.post(f"/{mode}/handle-response", params={"question": i % questions})
+        response.raise_for_status()
+    return requests / (time.perf_counter() - start)
+
+
+async def _handler_rps(handler: CallHandler, mode: str, requests: int, questions: int) -> float:
+    start = time.perf_counter()
+    for i in range(requests):
+        if mode == "dynamic":
+            handler._ask_next_question(VoiceResponse(), i % questions + 1)
+        else:
+            handler._cached_twiml(i % questions + 1)
+    return requests / (time.perf_counter() - start)
+
+
+async def _run(args) -> None:
+    handler = CallHandler()
+    questions = len(handler.questions)
+    transport = httpx.ASGITransport(app=_build_app(handler))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up both routes
+        await _webhook_rps(client, "dynamic", 50, questions)
+        await _webhook_rps(client, "cached", 50, questions)
+
+        print(f"{'mode':<10}{'webhook req/s':>15}{'handler req/s':>15}")
+        for mode in ("dynamic", "cached"):
+            webhook = await _webhook_rps(client, mode, args.requests, questions)
+            handler_only = await _handler_rps(handler, mode, args.requests * 10, questions)
+            print(f"{mode:<10}{webhook:>15.0f}{handler_only:>15.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+from config import CALL_EVENTS_CONFIG
+
+# Lifecycle column stamped by each Twilio call status
+LIFECYCLE_COLUMNS = {
+    "queued": "queued_at",
+    "initiated": "initiated_at",
+    "ringing": "ringing_at",
+    "in-progress": "answered_at",
+    "completed": "ended_at",
+    "busy": "ended_at",
+    "no-answer": "ended_at",
+    "failed": "ended_at",
+    "canceled": "ended_at"
+}
+
+
+def parse_status_callback(form: Dict[str, str]) -> Dict:
+    """Call event from a Twilio status callback's form fields"""
+    received_at = time.time()
+    timestamp = received_at
+    if form.get("Timestamp"):
+        try:
+            timestamp = parsedate_to_datetime(form["Timestamp"]).timestamp()
+        except (TypeError, ValueError):
+            pass
+    return {
+        "call_sid": form["CallSid"],
+        "status": form["CallStatus"],
+        "timestamp": timestamp,
+        "received_at": received_at,
+        "sequence": int(form.get("SequenceNumber") or 0),
+        "duration": int(form["CallDuration"]) if form.get("CallDuration") else None
+    }
+
+
+class CallEventStore:
+    """SQLite log of call status events plus one lifecycle row per call"""
+
+    def __init__(self, path: str = "call_events.db"):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS call_events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    call_sid TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    timestamp REAL NOT NULL,
+                    received_at REAL NOT NULL,
+                    payload TEXT NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS call_events_sid ON call_events (call_sid)")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS call_lifecycle (
+                    call_sid TEXT PRIMARY KEY,
+                    queued_at REAL,
+                    initiated_at REAL,
+                    ringing_at REAL,
+                    answered_at REAL,
+                    ended_at REAL,
+                    final_status TEXT,
+                    duration INTEGER,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS call_lifecycle_ended ON call_lifecycle (ended_at)")
+
+    def write_batch(self, events: List[Dict]) -> None:
+        """Append events and update lifecycles in a single transaction"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO call_events (call_sid, status, timestamp, received_at, payload) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (e["call_sid"], e["status"], e["timestamp"], e["received_at"], json.dumps(e))
+                        for e in events
+                    ]
+                )
+                for event in events:
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO call_lifecycle (call_sid, updated_at) VALUES (?, ?)",
+                        (event["call_sid"], now)
+                    )
+                    column = LIFECYCLE_COLUMNS.get(event["status"])
+                    if column is None:
+                        continue
+                    # Keep the first time each stage was reached; retried callbacks are ignored
+                    self._conn.execute(
+                        f"UPDATE call_lifecycle SET {column} = COALESCE({column}, ?), updated_at = ? "
+                        f"WHERE call_sid = ?",
+                        (event["timestamp"], now, event["call_sid"])
+                    )
+                    if column == "ended_at":
+                        self._conn.execute(
+                            "UPDATE call_lifecycle SET final_status = ?, "
+                            "duration = COALESCE(?, duration) WHERE call_sid = ?",
+                            (event["status"], event.get("duration"), event["call_sid"])
+                        )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def events(self, call_sid: str) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload FROM call_events WHERE call_sid = ? ORDER BY timestamp, id", (call_sid,)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def lifecycle(self, call_sid: str) -> Optional[Dict]:
+        """Stage timestamps of one call and the time spent between them"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM call_lifecycle WHERE call_sid = ?", (call_sid,)).fetchone()
+        if row is None:
+            return None
+        lifecycle = dict(row)
+        start = lifecycle["queued_at"] or lifecycle["initiated_at"]
+        lifecycle["setup_seconds"] = _elapsed(start, lifecycle["ringing_at"])
+        lifecycle["ring_seconds"] = _elapsed(lifecycle["ringing_at"], lifecycle["answered_at"])
+        lifecycle["talk_seconds"] = _elapsed(lifecycle["answered_at"], lifecycle["ended_at"])
+        return lifecycle
+
+    def stats(self, window_seconds: float = 3600.0) -> Dict:
+        """Outcomes and stage timings of calls that ended in the last ``window_seconds``
+
+        The dialer can pace itself on these, e.g. slow down when the answer
+        rate drops or calls sit ringing longer.
+        """
+        since = time.time() - window_seconds
+        with self._lock:
+            outcomes = dict(self._conn.execute(
+                "SELECT final_status, COUNT(*) FROM call_lifecycle WHERE ended_at >= ? GROUP BY final_status",
+                (since,)
+            ).fetchall())
+            timings = self._conn.execute("""
+                SELECT
+                    AVG(ringing_at - COALESCE(queued_at, initiated_at)),
+                    AVG(answered_at - ringing_at),
+                    AVG(ended_at - answered_at)
+                FROM call_lifecycle WHERE ended_at >= ?
+            """, (since,)).fetchone()
+            in_progress = self._conn.execute(
+                "SELECT COUNT(*) FROM call_lifecycle WHERE ended_at IS NULL"
+            ).fetchone()[0]
+
+        ended = sum(outcomes.values())
+        return {
+            "window_seconds": window_seconds,
+            "ended": ended,
+            "in_progress": in_progress,
+            "outcomes": outcomes,
+            "answer_rate": round(outcomes.get("completed", 0) / ended, 3) if ended else None,
+            "avg_setup_seconds": _round(timings[0]),
+            "avg_ring_seconds": _round(timings[1]),
+            "avg_talk_seconds": _round(timings[2])
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _elapsed(start: Optional[float], end: Optional[float]) -> Optional[float]:
+    return round(end - start, 3) if start is not None and end is not None else None
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 3) if value is not None else None
+
+
+# Queued by stop() behind the pending events to end the flusher
+_STOP = object()
+
+
+class CallEventIngestor:
+    """Buffers status callbacks in memory and writes them to the store in batches
+
+    ``submit`` only enqueues, so the webhook can be acknowledged immediately.
+    A background task flushes up to ``batch_size`` events at a time, at most
+    ``flush_interval`` seconds after the first one arrived, then passes each
+    event to the registered listeners (e.g. the dialer). When the queue is
+    full new events are dropped and counted rather than blocking Twilio.
+    """
+
+    def __init__(self,
+                 store: Optional[CallEventStore] = None,
+                 batch_size: Optional[int] = None,
+                 flush_interval: Optional[float] = None,
+                 max_queue: Optional[int] = None):
+        # Opened on first use, i.e. after a preforking server has forked
+        self._store = store
+        self.batch_size = batch_size or CALL_EVENTS_CONFIG['batch_size']
+        self.flush_interval = flush_interval or CALL_EVENTS_CONFIG['flush_interval']
+        self.max_queue = max_queue or CALL_EVENTS_CONFIG['max_queue']
+        self._listeners: List[Callable[[Dict], Awaitable[None]]] = []
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.received = 0
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+
+    @property
+    def store(self) -> CallEventStore:
+        if self._store is None:
+            self._store = CallEventStore(CALL_EVENTS_CONFIG['db_path'])
+        return self._store
+
+    def add_listener(self, listener: Callable[[Dict], Awaitable[None]]) -> None:
+        """Call ``listener(event)`` for every event after it is stored"""
+        self._listeners.append(listener)
+
+    def _get_queue(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+        return self._queue
+
+    def submit(self, event: Dict) -> bool:
+        """Queue an event without waiting; False if it was dropped"""
+        try:
+            self._get_queue().put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self.received += 1
+        return True
+
+    def start(self) -> None:
+        # Open the database here rather than on the first callback
+        self.store
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flusher after writing everything still queued
+
+        A sentinel is queued behind the pending events, so the flusher writes
+        its current batch and everything ahead of the sentinel before exiting.
+        """
+        queue = self._get_queue()
+        if self._task is not None and not self._task.done():
+            await queue.put(_STOP)
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        # Events submitted while stopping
+        while not queue.empty():
+            batch = [event for event in self._drain(queue, []) if event is not _STOP]
+            await self._flush(batch)
+
+    def _drain(self, queue: asyncio.Queue, batch: List) -> List:
+        while len(batch) < self.batch_size and not queue.empty():
+            batch.append(queue.get_nowait())
+            if batch[-1] is _STOP:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        queue = self._get_queue()
+        loop = asyncio.get_event_loop()
+        batch: List = []
+        try:
+            while True:
+                batch = [await queue.get()]
+                deadline = loop.time() + self.flush_interval
+                while len(batch) < self.batch_size and batch[-1] is not _STOP:
+                    self._drain(queue, batch)
+                    remaining = deadline - loop.time()
+                    if len(batch) >= self.batch_size or batch[-1] is _STOP or remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout=remaining))
+                    except asyncio.TimeoutError:
+                        break
+
+                stopping = batch[-1] is _STOP
+                events, batch = [event for event in batch if event is not _STOP], []
+                await self._flush(events)
+                if stopping:
+                    return
+        finally:
+            # Cancelled mid-collection: never lose events already taken off the queue
+            events = [event for event in batch if event is not _STOP]
+            if events:
+                await asyncio.shield(self._flush(events))
+
+    async def _flush(self, batch: List[Dict]) -> None:
+        if not batch:
+            return
+        try:
+            await asyncio.get_event_loop().run_in_executor(None, self.store.write_batch, batch)
+            self.written += len(batch)
+            self.batches += 1
+        except Exception as e:
+            print(f"Warning: Could not store {len(batch)} call events: {e}")
+
+        for event in batch:
+            for listener in self._listeners:
+                try:
+                    await listener(event)
+                except Exception as e:
+                    print(f"Warning: Call event listener failed for {event['call_sid']}: {e}")
+
+    def stats(self) -> Dict:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "received": self.received,
+            "dropped": self.dropped,
+            "written": self.written,
+            "batches": self.batches,
+            "avg_batch_size": round(self.written / self.batches, 1) if self.batches else 0.0
+        }
+
+
+def handle_status_callback(form: Dict[str, str], ingestor: "CallEventIngestor", sessions) -> bool:
+    """The one path for Twilio status callbacks; returns False if the event was dropped
+
+    Queues the event for batched storage (and the dialer, through the
+    ingestor's listeners) and updates the call's session status right away.
+    """
+    event = parse_status_callback(form)
+    queued = ingestor.submit(event)
+    if not queued:
+        print(f"Warning: Call event queue full, dropped {event['status']} for {event['call_sid']}")
+
+    session = sessions.get(event["call_sid"])
+    if session is not None:
+        session.status = event["status"]
+        if LIFECYCLE_COLUMNS.get(event["status"]) == "ended_at":
+            session.timings["call_seconds"] = round(time.time() - session.started_at, 3)
+        sessions.put(session)
+    return queued
+
+
+_shared_ingestor: Optional[CallEventIngestor] = None
+_shared_lock = threading.Lock()
+
+
+def get_call_event_ingestor() -> CallEventIngestor:
+    """Process-wide ingestor built from CALL_EVENTS_CONFIG"""
+    global _shared_ingestor
+    if _shared_ingestor is None:
+        with _shared_lock:
+            if _shared_ingestor is None:
+                _shared_ingestor = CallEventIngestor()
+    return _shared_ingestor
@@ -1,63 +1,249 @@
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Set, Tuple
+import asyncio
+import functools
+import time
 from twilio.rest import Client
 from twilio.twiml.voice_response import VoiceResponse, Gather
 from text_to_speech import TextToSpeech
+from speech_to_text import SpeechToText, model_for_question
+from nlp_analysis import NLPAnalyzer
+from decision_engine import DecisionEngine
+from config import APP_CONFIG, CALL_PROMPTS, INTERVIEW_QUESTIONS
+from prompt_bundle import PromptBundle, get_prompt_bundle
+from session_store import get_session_store
+from call_events import CallEventIngestor, get_call_event_ingestor, handle_status_callback
+from twilio_transport import get_twilio_http_client
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
 class CallHandler:
-    def __init__(self):
+    def __init__(self,
+                 prompt_bundle: Optional[PromptBundle] = None,
+                 sessions=None,
+                 stt: Optional[SpeechToText] = None,
+                 nlp: Optional[NLPAnalyzer] = None,
+                 decision_engine: Optional[DecisionEngine] = None,
+                 events: Optional[CallEventIngestor] = None):
         self.account_sid = os.getenv('TWILIO_ACCOUNT_SID')
         self.auth_token = os.getenv('TWILIO_AUTH_TOKEN')
         self.phone_number = os.getenv('TWILIO_PHONE_NUMBER')
-        self.client = Client(self.account_sid, self.auth_token)
+        # All handlers share one pooled keep-alive transport
+        self.client = Client(self.account_sid, self.auth_token, http_client=get_twilio_http_client())
         self.tts = TextToSpeech()
-        self.questions = [
-            "Can you tell me about yourself?",
-            "What are your key skills?",
-            "How many years of experience do you have?",
-            
-        ]
+        # Pre-rendered prompt audio; prompts missing from it fall back to <Say>
+        self.prompt_bundle = prompt_bundle or get_prompt_bundle()
+        # Interview progress lives server-side, keyed by CallSid
+        self.sessions = sessions if sessions is not None else get_session_store()
+        # Status callbacks are queued and stored in batches
+        self.events = events or get_call_event_ingestor()
+        # Answers are transcribed and analyzed in the background while the next question plays
+        self.stt = stt or SpeechToText()
+        self.nlp = nlp or NLPAnalyzer()
+        self.decision_engine = decision_engine or DecisionEngine()
+        self._analysis_tasks: Dict[str, Set[asyncio.Task]] = {}
+        self.question_ids = [question['id'] for question in INTERVIEW_QUESTIONS]
+        self.questions = [question['text'] for question in INTERVIEW_QUESTIONS]
+        self._twiml: Dict = {}
+        self._rendered_signature: Optional[Tuple] = None
+        self.render_twiml()
 
     async def start_call(self, to_number: str) -> Dict:
         """Initiate a call to the candidate"""
         try:
-            call = self.client.calls.create(
+            # The Twilio client is blocking; keep the round-trip off the event loop
+            loop = asyncio.get_event_loop()
+            call = await loop.run_in_executor(None, functools.partial(
+                self.client.calls.create,
                 to=to_number,
                 from_=self.phone_number,
                 url=self._get_webhook_url('/welcome'),
                 status_callback=self._get_webhook_url('/call-status'),
-                status_callback_event=['completed', 'failed']
-            )
+                status_callback_event=['initiated', 'ringing', 'answered', 'completed']
+            ))
+            # Twilio sends no callback for queueing; record it to start the lifecycle
+            now = time.time()
+            self.events.submit({
+                "call_sid": call.sid, "status": call.status,
+                "timestamp": now, "received_at": now, "sequence": -1, "duration": None
+            })
             return {"call_id": call.sid, "status": call.status}
         except Exception as e:
             raise Exception(f"Failed to initiate call: {str(e)}")
 
+    async def find_call(self, to_number: str, since: float) -> Optional[Dict]:
+        """Latest call from our number to ``to_number`` created at or after ``since``
+
+        Lets the dialer tell whether an interrupted dial actually reached Twilio.
+        """
+        loop = asyncio.get_event_loop()
+        calls = await loop.run_in_executor(None, functools.partial(
+            self.client.calls.list, to=to_number, from_=self.phone_number, limit=20
+        ))
+        # Allow a little clock skew between this host and Twilio
+        created = [call for call in calls if call.date_created and call.date_created.timestamp() >= since - 5]
+        if not created:
+            return None
+        call = max(created, key=lambda call: call.date_created)
+        return {"call_id": call.sid, "status": call.status}
+
     def _get_webhook_url(self, endpoint: str) -> str:
         """Get the webhook URL for Twilio callbacks"""
-        base_url = os.getenv('BASE_URL', 'http://localhost:8000')
-        return f"{base_url}{endpoint}"
+        return f"{APP_CONFIG['base_url']}{endpoint}"
 
-    async def handle_welcome(self) -> str:
-        """Generate TwiML for welcome message"""
-        response = VoiceResponse()
-        response.say(
-            "Hello, this is the HR team calling regarding your job application. "
-            "We would like to ask you a few questions."
+    def _add_prompt(self, parent, prompt_id: str, text: str) -> None:
+        """Play the pre-rendered prompt if available, otherwise speak it"""
+        url = self.prompt_bundle.url_for(prompt_id, text, key=self.tts.cache_key('text', text))
+        if url:
+            parent.play(url)
+        else:
+            parent.say(text)
+
+    async def handle_welcome(self, call_sid: Optional[str] = None) -> bytes:
+        """TwiML for the welcome message and the first question"""
+        if call_sid:
+            # A retried or redirected welcome keeps the call's progress
+            self.sessions.get_or_create(call_sid)
+        return self._cached_twiml("welcome")
+
+    async def handle_response(self,
+                              call_sid: str,
+                              transcript: Optional[str] = None,
+                              recording_url: Optional[str] = None) -> bytes:
+        """Record the answer to the caller's current question and ask the next one
+
+        The question cursor is kept in the call session rather than taken from
+        the webhook URL, so a replayed or reordered webhook cannot skip ahead.
+        The next question's TwiML is returned at once; transcribing (when only
+        a recording is given) and analyzing the answer run in the background.
+        """
+        session = self.sessions.get_or_create(call_sid)
+        index = session.question_index
+        if index >= len(self.questions):
+            return self._cached_twiml("goodbye")
+
+        now = time.time()
+        if transcript:
+            session.transcripts[index] = transcript
+        # Time from the question being served to this answer; updated_at is no
+        # measure, background analysis of earlier answers bumps it
+        session.timings[f"answer_{index}_seconds"] = round(now - session.question_asked_at, 3)
+        session.question_index = index + 1
+        session.question_asked_at = now
+        self.sessions.put(session)
+
+        task = asyncio.ensure_future(self._analyze_answer(call_sid, index, transcript, recording_url))
+        tasks = self._analysis_tasks.setdefault(call_sid, set())
+        tasks.add(task)
+        task.add_done_callback(lambda t: self._forget_task(call_sid, t))
+        return self._cached_twiml(index + 1)
+
+    def _forget_task(self, call_sid: str, task: asyncio.Task) -> None:
+        tasks = self._analysis_tasks.get(call_sid)
+        if tasks is not None:
+            tasks.discard(task)
+            if not tasks:
+                del self._analysis_tasks[call_sid]
+
+    async def wait_for_analysis(self, call_sid: str) -> None:
+        """Wait until every answer of the call received so far has been analyzed"""
+        tasks = list(self._analysis_tasks.get(call_sid, ()))
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _analyze_answer(self,
+                              call_sid: str,
+                              index: int,
+                              transcript: Optional[str],
+                              recording_url: Optional[str]) -> None:
+        """Transcribe and analyze one answer, then evaluate once all answers are in"""
+        started = time.perf_counter()
+        try:
+            if not transcript and recording_url:
+                question = INTERVIEW_QUESTIONS[index] if index < len(INTERVIEW_QUESTIONS) else {}
+                result = await self.stt.transcribe(recording_url, model_for_question(question))
+                transcript = result.get("text", "").strip()
+            analysis = await self.nlp.analyze(transcript) if transcript else {}
+        except Exception as e:
+            print(f"Warning: Could not analyze answer {index} of call {call_sid}: {e}")
+            analysis = {"error": str(e)}
+
+        # No awaits between reading and writing the session, so concurrent
+        # answers of the same call cannot overwrite each other's results
+        session = self.sessions.get(call_sid)
+        if session is None:
+            return
+        if transcript:
+            session.transcripts[index] = transcript
+        session.analyses[index] = analysis
+        session.timings[f"analysis_{index}_seconds"] = round(time.perf_counter() - started, 3)
+        ready = (
+            session.question_index >= len(self.questions)
+            and len(session.analyses) >= len(self.questions)
+            and session.result is None
         )
-        return self._ask_next_question(response, 0)
+        if ready:
+            session.result = {"decision": "Pending"}
+        self.sessions.put(session)
 
-    async def handle_response(self, question_index: int, response_audio: bytes) -> Optional[str]:
-        """Process candidate's response and ask next question"""
-        if question_index >= len(self.questions):
-            return self._generate_goodbye_twiml()
+        if ready:
+            await self._evaluate(call_sid)
 
-        # Here we would normally process the audio response
-        # For now, we'll just continue with the next question
-        response = VoiceResponse()
-        return self._ask_next_question(response, question_index + 1)
+    async def _evaluate(self, call_sid: str) -> None:
+        """Final decision over the merged analyses of every answer"""
+        started = time.perf_counter()
+        session = self.sessions.get(call_sid)
+        if session is None:
+            return
+        analyses: List[Dict] = [session.analyses[i] for i in sorted(session.analyses)]
+        try:
+            result = await self.decision_engine.evaluate(self.decision_engine.merge_analyses(analyses))
+        except Exception as e:
+            print(f"Warning: Could not evaluate call {call_sid}: {e}")
+            result = self.decision_engine._generate_error_response(str(e))
+
+        session = self.sessions.get(call_sid)
+        if session is None:
+            return
+        session.result = result
+        session.timings["evaluation_seconds"] = round(time.perf_counter() - started, 3)
+        self.sessions.put(session)
+
+    def _twiml_signature(self) -> Tuple:
+        """Everything the rendered TwiML depends on"""
+        return (
+            tuple(self.question_ids),
+            tuple(self.questions),
+            # Changes when PromptBundle.load or build changes the manifest
+            self.prompt_bundle.version,
+            # Same base URL the bundle's <Play> URLs are built from
+            APP_CONFIG['base_url']
+        )
+
+    def render_twiml(self) -> None:
+        """Render every step of the question flow to TwiML bytes
+
+        The documents are identical for every call, so webhooks return these
+        bytes instead of building and serializing a VoiceResponse per request.
+        """
+        welcome = VoiceResponse()
+        self._add_prompt(welcome, 'welcome', CALL_PROMPTS['welcome'])
+        twiml = {
+            "welcome": self._ask_next_question(welcome, 0).encode("utf-8"),
+            "goodbye": self._generate_goodbye_twiml().encode("utf-8")
+        }
+        for index in range(1, len(self.questions) + 1):
+            twiml[index] = self._ask_next_question(VoiceResponse(), index).encode("utf-8")
+
+        self._twiml = twiml
+        self._rendered_signature = self._twiml_signature()
+
+    def _cached_twiml(self, step) -> bytes:
+        # Re-render if the questions or the prompt bundle changed since the last render
+        if self._twiml_signature() != self._rendered_signature:
+            self.render_twiml()
+        return self._twiml[step]
 
     def _ask_next_question(self, response: VoiceResponse, index: int) -> str:
         """Add the next question to the TwiML response"""
@@ -69,30 +255,29 @@ class CallHandler:
                 timeout=5,
                 speech_timeout='auto'
             )
-            gather.say(self.questions[index])
+            self._add_prompt(gather, self.question_ids[index], self.questions[index])
             response.append(gather)
 
             # If no input received
             response.redirect(f'/handle-response?question={index}')
         else:
-            response.append(self._generate_goodbye_twiml())
+            self._add_goodbye(response)
 
         return str(response)
 
+    def _add_goodbye(self, response: VoiceResponse) -> None:
+        self._add_prompt(response, 'goodbye', CALL_PROMPTS['goodbye'])
+        response.hangup()
+
     def _generate_goodbye_twiml(self) -> str:
         """Generate TwiML for goodbye message"""
         response = VoiceResponse()
-        response.say(
-            "Thank you for your time. We will review your responses "
-            "and get back to you soon. Have a great day!"
-        )
-        response.hangup()
+        self._add_goodbye(response)
         return str(response)
 
-    async def handle_call_status(self, call_sid: str, status: str) -> None:
-        """Handle call status updates"""
-        # Log call status and take appropriate actions
-        print(f"Call {call_sid} status: {status}")
+    async def handle_call_status(self, form: Dict[str, str]) -> bool:
+        """Handle a status callback; returns as soon as the event is queued"""
+        return handle_status_callback(form, self.events, self.sessions)
 
     def mock_call(self) -> Dict:
         """Mock function for testing without actual Twilio integration"""
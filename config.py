@@ -8,7 +8,14 @@ load_dotenv()
 TWILIO_CONFIG = {
     'account_sid': os.getenv('TWILIO_ACCOUNT_SID'),
     'auth_token': os.getenv('TWILIO_AUTH_TOKEN'),
-    'phone_number': os.getenv('TWILIO_PHONE_NUMBER')
+    'phone_number': os.getenv('TWILIO_PHONE_NUMBER'),
+    # REST transport: one keep-alive connection pool shared by every CallHandler
+    'http_pool_size': int(os.getenv('TWILIO_HTTP_POOL_SIZE', 10)),
+    'http_connect_timeout': float(os.getenv('TWILIO_HTTP_CONNECT_TIMEOUT', 3.0)),
+    'http_read_timeout': float(os.getenv('TWILIO_HTTP_READ_TIMEOUT', 10.0)),
+    # Retries cover connection failures and 429s only, so a call is never placed twice
+    'http_max_retries': int(os.getenv('TWILIO_HTTP_MAX_RETRIES', 3)),
+    'http_backoff': 0.5
 }
 
 # Google Cloud Configuration
@@ -22,50 +29,211 @@ APP_CONFIG = {
     'host': os.getenv('APP_HOST', '0.0.0.0'),
     'port': int(os.getenv('APP_PORT', 8000)),
     'debug': os.getenv('DEBUG', 'False').lower() == 'true',
-    'base_url': os.getenv('BASE_URL', 'http://localhost:8000')
+    'base_url': os.getenv('BASE_URL', 'http://localhost:8000'),
+    # Server worker processes (gunicorn and uvicorn both read WEB_CONCURRENCY)
+    'workers': int(os.getenv('WEB_CONCURRENCY', 1))
+}
+
+# Model loading
+MODEL_CONFIG = {
+    'whisper_model': os.getenv('WHISPER_MODEL', 'base'),
+    # Comma-separated registry names preloaded in the background at startup
+    'preload': [name.strip() for name in os.getenv('PRELOAD_MODELS', '').split(',') if name.strip()],
+    # Load PRELOAD_MODELS synchronously at import, before a preforking server forks workers
+    'preload_before_fork': os.getenv('PRELOAD_BEFORE_FORK', 'False').lower() == 'true'
+}
+
+# Text-to-speech configuration
+TTS_CONFIG = {
+    # Synthesized audio cache: in-memory LRU over an on-disk store that survives restarts
+    'cache_enabled': os.getenv('TTS_CACHE_ENABLED', 'True').lower() == 'true',
+    'cache_dir': os.getenv('TTS_CACHE_DIR', '.tts_cache'),
+    'cache_max_entries': 256,
+    'cache_max_bytes': 32 * 1024 * 1024,
+    # Upstream synthesis runs in its own thread pool so it never blocks the event loop
+    'max_in_flight': int(os.getenv('TTS_MAX_IN_FLIGHT', 8)),
+    'queue_timeout': float(os.getenv('TTS_QUEUE_TIMEOUT', 5.0)),
+    # Deadline for one synthesis request, in seconds
+    'request_timeout': float(os.getenv('TTS_REQUEST_TIMEOUT', 10.0)),
+    # Streaming synthesis: sentences are synthesized separately and sent in chunks
+    'stream_chunk_size': 4096,
+    'stream_max_sentence_chars': 200,
+    'stream_lookahead': 2,
+    # Seconds before the voice catalog is refreshed in the background
+    'voice_catalog_ttl': float(os.getenv('VOICE_CATALOG_TTL', 24 * 60 * 60)),
+    # Seconds before a failed voice catalog fetch is retried
+    'voice_catalog_retry': float(os.getenv('VOICE_CATALOG_RETRY', 60))
+}
+
+# Speech-to-text configuration
+STT_CONFIG = {
+    # Recording downloads (pooled keep-alive client, retried with exponential backoff)
+    'download_timeout': float(os.getenv('AUDIO_DOWNLOAD_TIMEOUT', 10.0)),
+    'download_connect_timeout': 3.0,
+    'download_retries': int(os.getenv('AUDIO_DOWNLOAD_RETRIES', 3)),
+    'download_backoff': 0.5,
+    'download_max_connections': 20,
+    'download_max_bytes': 25 * 1024 * 1024,
+    'download_chunk_size': 64 * 1024,
+    # 'whisper' (openai-whisper) or 'faster-whisper' (CTranslate2, quantized CPU inference)
+    'engine': os.getenv('STT_ENGINE', 'whisper'),
+    'compute_type': os.getenv('STT_COMPUTE_TYPE', 'int8'),  # faster-whisper only
+    'cpu_threads': int(os.getenv('STT_CPU_THREADS', 0)),     # faster-whisper only, 0 = default
+    # Micro-batching of utterances from concurrent calls through one Whisper model
+    'batch_max_size': int(os.getenv('STT_BATCH_MAX_SIZE', 8)),
+    'batch_max_wait_ms': float(os.getenv('STT_BATCH_MAX_WAIT_MS', 50))
+}
+
+# Live transcription of Twilio Media Streams (8 kHz mu-law)
+STREAMING_CONFIG = {
+    'vad_aggressiveness': 2,        # webrtcvad mode 0-3, when installed
+    'energy_threshold_db': -45.0,   # energy gate used without webrtcvad
+    'end_silence_ms': 700,          # silence that ends an utterance
+    'partial_interval_ms': 1000,    # how often partial transcripts are produced
+    'window_seconds': 8.0,          # audio re-transcribed for each partial
+    'max_utterance_seconds': 30.0,  # force a final transcript after this long
+    'min_speech_ms': 200,           # shorter bursts are treated as noise
+    'pre_roll_ms': 200              # audio kept from before speech onset
 }
 
 # NLP Configuration
 NLP_CONFIG = {
     'sentiment_threshold': 0.5,
     'keyword_min_length': 3,
-    'max_keywords': 10
+    'max_keywords': 10,
+    'batch_size': 32,
+    # Answers with fewer words are flagged as "Very short response"
+    'short_response_words': 5,
+    # Corpus document-frequency table for keyphrase ranking (see keyphrase_extractor.py)
+    'keyphrase_df_path': os.getenv('KEYPHRASE_DF_PATH', 'keyphrase_df.json'),
+    # 'vader' (lexicon only), 'transformer' (HF model only) or 'ensemble' (both, fused)
+    'sentiment_strategy': os.getenv('SENTIMENT_STRATEGY', 'vader'),
+    # Polarity scores closer to 0 than this are labelled "Neutral"; the
+    # transformer's binary POS/NEG output is almost never exactly 0
+    'neutral_band': float(os.getenv('SENTIMENT_NEUTRAL_BAND', 0.1)),
+    'ensemble_weights': {
+        'vader': 0.5,
+        'transformer': 0.5
+    }
+}
+
+# Tone flags raised when any of their phrases appears in an answer.
+# Phrases are matched case-insensitively on word boundaries; add freely,
+# all of them are compiled into a single pattern at startup.
+TONE_RULES = {
+    'Negative language detected': [
+        'never', 'no', 'not', 'cannot', "won't",
+        'hate', 'dislike', 'awful', 'terrible',
+        'impossible', 'difficult', 'hard', 'problem'
+    ],
+    'Vague response': [
+        'maybe', 'somewhat', 'kind of', 'sort of', 'i guess'
+    ]
+}
+
+# Worker pool for CPU-bound stages (NLP inference, decision scoring)
+EXECUTOR_CONFIG = {
+    'kind': os.getenv('EXECUTOR_KIND', 'thread'),  # 'thread' or 'process'
+    'max_workers': int(os.getenv('EXECUTOR_MAX_WORKERS', 4)),
+    'max_queue': int(os.getenv('EXECUTOR_MAX_QUEUE', 32)),
+    'queue_timeout': float(os.getenv('EXECUTOR_QUEUE_TIMEOUT', 5.0))
 }
 
 # Interview Questions
+# 'stt_model' picks the Whisper size used for the answer: tiny is enough for
+# yes/no answers, open-ended answers get a larger, more accurate model.
 INTERVIEW_QUESTIONS = [
     {
         'id': 'intro',
         'text': 'Can you tell me about yourself?',
         'type': 'open_ended',
-        'weight': 1.0
+        'weight': 1.0,
+        'stt_model': 'small'
     },
     {
         'id': 'skills',
         'text': 'What are your key skills?',
         'type': 'skills',
-        'weight': 1.5
+        'weight': 1.5,
+        'stt_model': 'base'
     },
     {
         'id': 'experience',
         'text': 'How many years of experience do you have?',
         'type': 'numeric',
-        'weight': 1.2
+        'weight': 1.2,
+        'stt_model': 'base'
     },
     {
         'id': 'location',
         'text': 'What is your current location?',
         'type': 'location',
-        'weight': 0.8
+        'weight': 0.8,
+        'stt_model': 'base'
     },
     {
         'id': 'availability',
         'text': 'Are you available to join immediately?',
         'type': 'boolean',
-        'weight': 0.5
+        'weight': 0.5,
+        'stt_model': 'tiny'
     }
 ]
 
+# Fixed call-flow prompts spoken around the interview questions
+CALL_PROMPTS = {
+    'welcome': (
+        "Hello, this is the HR team calling regarding your job application. "
+        "We would like to ask you a few questions."
+    ),
+    'goodbye': (
+        "Thank you for your time. We will review your responses "
+        "and get back to you soon. Have a great day!"
+    )
+}
+
+# Pre-rendered prompt audio, served statically and played with <Play>
+PROMPT_CONFIG = {
+    'bundle_dir': os.getenv('PROMPT_BUNDLE_DIR', 'static/prompts'),
+    'url_path': '/prompts',
+    # Render missing prompts in the background when the app starts
+    'prerender_on_startup': os.getenv('PRERENDER_PROMPTS', 'False').lower() == 'true'
+}
+
+# Campaign dialer: queued outbound calls paced to the carrier's calls-per-second limit
+DIALER_CONFIG = {
+    'db_path': os.getenv('DIALER_DB_PATH', 'dialer.db'),
+    'workers': int(os.getenv('DIALER_WORKERS', 4)),
+    'calls_per_second': float(os.getenv('DIALER_CPS', 1.0)),
+    'max_attempts': int(os.getenv('DIALER_MAX_ATTEMPTS', 3)),
+    # Seconds before a busy or unanswered candidate is dialed again
+    'retry_delay': float(os.getenv('DIALER_RETRY_DELAY', 300)),
+    'retry_statuses': ['busy', 'no-answer'],
+    'poll_interval': 1.0,
+    # Only the process holding this lock dials; the others take over if it exits
+    'lock_path': os.getenv('DIALER_LOCK_PATH', os.getenv('DIALER_DB_PATH', 'dialer.db') + '.lock'),
+    'leader_retry': 5.0
+}
+
+# Call status callbacks: queued in memory and written to SQLite in batches
+CALL_EVENTS_CONFIG = {
+    'db_path': os.getenv('CALL_EVENTS_DB_PATH', 'call_events.db'),
+    'batch_size': 200,
+    # Seconds an event may wait in memory before its batch is written
+    'flush_interval': float(os.getenv('CALL_EVENTS_FLUSH_INTERVAL', 0.5)),
+    'max_queue': 10000
+}
+
+# Per-call interview state, keyed by CallSid
+SESSION_CONFIG = {
+    # memory or sqlite; memory sessions are per process, so several workers need sqlite
+    'backend': os.getenv('SESSION_BACKEND') or ('sqlite' if APP_CONFIG['workers'] > 1 else 'memory'),
+    'db_path': os.getenv('SESSION_DB_PATH', 'sessions.db'),
+    # Seconds without activity before an abandoned call's session is evicted
+    'ttl': float(os.getenv('SESSION_TTL', 3600)),
+    'max_sessions': int(os.getenv('SESSION_MAX', 100000))
+}
+
 # Decision Engine Configuration
 DECISION_CONFIG = {
     'score_weights': {
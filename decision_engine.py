@@ -1,8 +1,10 @@
 from typing import Dict, List, Optional
+from executor import BoundedExecutor, ExecutorBusyError, get_executor
 
 class DecisionEngine:
-    def __init__(self):
+    def __init__(self, executor: Optional[BoundedExecutor] = None):
         """Initialize decision engine with evaluation criteria"""
+        self.executor = executor or get_executor()
         self.skill_keywords = {
             'technical': [
                 'python', 'java', 'javascript', 'react', 'angular', 'vue', 'node',
@@ -22,6 +24,50 @@ class DecisionEngine:
 
     async def evaluate(self, analysis: Dict) -> Dict:
         """Evaluate candidate based on NLP analysis results"""
+        try:
+            if self.executor.is_process:
+                return await self.executor.run(_evaluate_in_worker, analysis)
+            return await self.executor.run(self.evaluate_sync, analysis)
+
+        except ExecutorBusyError:
+            raise
+        except Exception as e:
+            return self._generate_error_response(str(e))
+
+    def merge_analyses(self, analyses: List[Dict]) -> Dict:
+        """Combine the per-answer analyses of one interview into a single analysis
+
+        Sentiment is the average over the answers, keywords and tone flags are
+        the de-duplicated union, and each candidate detail is taken from the
+        first answer that mentions it. Failed or empty analyses are skipped.
+        """
+        analyses = [a for a in analyses if a and 'error' not in a]
+        if not analyses:
+            return {}
+
+        scale = ['Very Negative', 'Negative', 'Neutral', 'Positive', 'Very Positive']
+        scores = [scale.index(a['sentiment']) for a in analyses if a.get('sentiment') in scale]
+        sentiment = scale[round(sum(scores) / len(scores))] if scores else 'Neutral'
+
+        keywords: List[str] = []
+        tone_flags: List[str] = []
+        extracted_info: Dict = {}
+        for analysis in analyses:
+            keywords.extend(k for k in analysis.get('keywords', []) if k not in keywords)
+            tone_flags.extend(f for f in analysis.get('tone_flags', []) if f not in tone_flags)
+            for key, value in (analysis.get('extracted_info') or {}).items():
+                if value and not extracted_info.get(key):
+                    extracted_info[key] = value
+
+        return {
+            'sentiment': sentiment,
+            'keywords': keywords,
+            'tone_flags': tone_flags,
+            'extracted_info': extracted_info
+        }
+
+    def evaluate_sync(self, analysis: Dict) -> Dict:
+        """Blocking evaluation, run inside the worker pool"""
         try:
             # Extract relevant information
             sentiment = analysis.get('sentiment', '')
@@ -165,4 +211,15 @@ class DecisionEngine:
             'sentiment': 'N/A',
             'decision': 'Error',
             'reason': f'Evaluation failed: {error_message}'
-        }
\ No newline at end of file
+        }
+
+
+# Per-process engine used when the executor runs stages in a process pool
+_worker_engine: Optional[DecisionEngine] = None
+
+
+def _evaluate_in_worker(analysis: Dict) -> Dict:
+    global _worker_engine
+    if _worker_engine is None:
+        _worker_engine = DecisionEngine()
+    return _worker_engine.evaluate_sync(analysis)
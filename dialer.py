@@ -0,0 +1,453 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+from config import DIALER_CONFIG
+
+# Job states; a job waiting for a retry is "queued" with a later next_attempt_at
+QUEUED = "queued"
+DIALING = "dialing"
+# Interrupted while dialing: a call may or may not have been placed
+NEEDS_RECONCILE = "needs-reconcile"
+IN_PROGRESS = "in-progress"
+COMPLETED = "completed"
+FAILED = "failed"
+
+# Twilio call statuses that end a call
+FINAL_CALL_STATUSES = ("completed", "busy", "no-answer", "failed", "canceled")
+
+
+class TokenBucket:
+    """Paces callers to ``rate`` acquisitions per second, with bursts up to ``burst``"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop = None
+
+    def _get_lock(self, loop) -> asyncio.Lock:
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    async def acquire(self) -> None:
+        async with self._get_lock(asyncio.get_event_loop()):
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def refund(self) -> None:
+        """Return an acquired token that was not used"""
+        self._tokens = min(self.capacity, self._tokens + 1)
+
+
+class JobStore:
+    """SQLite-backed dial jobs, so a restart resumes the campaign where it stopped"""
+
+    def __init__(self, path: str = "dialer.db"):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS dial_jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    phone_number TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL,
+                    call_id TEXT,
+                    last_status TEXT,
+                    last_error TEXT,
+                    dialed_at REAL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            columns = [row["name"] for row in self._conn.execute("PRAGMA table_info(dial_jobs)")]
+            if "dialed_at" not in columns:
+                self._conn.execute("ALTER TABLE dial_jobs ADD COLUMN dialed_at REAL")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS dial_jobs_due ON dial_jobs (status, next_attempt_at)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS dial_jobs_call ON dial_jobs (call_id)")
+            # Status callbacks that arrived before the dialer stored the call's SID
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS early_call_status (
+                    call_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    received_at REAL NOT NULL
+                )
+            """)
+
+    def enqueue(self, phone_numbers: Iterable[str]) -> List[int]:
+        now = time.time()
+        ids = []
+        with self._lock:
+            self._conn.execute("BEGIN")
+            for number in phone_numbers:
+                cursor = self._conn.execute(
+                    "INSERT INTO dial_jobs (phone_number, status, next_attempt_at, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (number, QUEUED, now, now, now)
+                )
+                ids.append(cursor.lastrowid)
+            self._conn.execute("COMMIT")
+        return ids
+
+    def claim(self) -> Optional[Dict]:
+        """Take the next due job and mark it as dialing"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            row = self._conn.execute(
+                "SELECT * FROM dial_jobs WHERE status = ? AND next_attempt_at <= ? "
+                "ORDER BY next_attempt_at, id LIMIT 1",
+                (QUEUED, now)
+            ).fetchone()
+            if row is not None:
+                self._conn.execute(
+                    "UPDATE dial_jobs SET status = ?, attempts = attempts + 1, dialed_at = ?, updated_at = ? "
+                    "WHERE id = ?",
+                    (DIALING, now, now, row["id"])
+                )
+            self._conn.execute("COMMIT")
+        if row is None:
+            return None
+        job = dict(row)
+        job["status"] = DIALING
+        job["attempts"] += 1
+        job["dialed_at"] = now
+        return job
+
+    def update(self, job_id: int, **fields) -> None:
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE dial_jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id: int) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM dial_jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def find_by_call(self, call_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM dial_jobs WHERE call_id = ?", (call_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def find_or_hold(self, call_id: str, call_status: str) -> Optional[Dict]:
+        """Job placed as ``call_id``; if there is none yet, keep the status for ``attach_call``
+
+        A final status is never replaced by a later non-final one. Held
+        statuses no call claims within an hour are dropped.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT * FROM dial_jobs WHERE call_id = ?", (call_id,)).fetchone()
+                if row is None:
+                    held = self._conn.execute(
+                        "SELECT status FROM early_call_status WHERE call_id = ?", (call_id,)
+                    ).fetchone()
+                    if held is None or held[0] not in FINAL_CALL_STATUSES:
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO early_call_status (call_id, status, received_at) VALUES (?, ?, ?)",
+                            (call_id, call_status, now)
+                        )
+                    self._conn.execute("DELETE FROM early_call_status WHERE received_at < ?", (now - 3600,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return dict(row) if row is not None else None
+
+    def attach_call(self, job_id: int, call_id: str, call_status: Optional[str]) -> Optional[str]:
+        """Record the call placed for a job; returns its latest status
+
+        That is a status callback held by ``find_or_hold`` if one arrived first,
+        otherwise ``call_status``.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                held = self._conn.execute(
+                    "SELECT status FROM early_call_status WHERE call_id = ?", (call_id,)
+                ).fetchone()
+                if held is not None:
+                    call_status = held[0]
+                    self._conn.execute("DELETE FROM early_call_status WHERE call_id = ?", (call_id,))
+                self._conn.execute(
+                    "UPDATE dial_jobs SET status = ?, call_id = ?, last_status = ?, updated_at = ? WHERE id = ?",
+                    (IN_PROGRESS, call_id, call_status, now, job_id)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return call_status
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM dial_jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def recover(self) -> int:
+        """Flag jobs left dialing by a crash for reconciling; their call may have been placed"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE dial_jobs SET status = ?, updated_at = ? WHERE status = ?",
+                (NEEDS_RECONCILE, time.time(), DIALING)
+            )
+        return cursor.rowcount
+
+    def unreconciled(self) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM dial_jobs WHERE status = ? ORDER BY id", (NEEDS_RECONCILE,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _try_lock(path: str):
+    """Open ``path`` and take an exclusive lock on it; None if another process holds it"""
+    lock_file = open(path, "a")
+    try:
+        import fcntl
+    except ImportError:
+        # No flock (Windows): run as the only dialer
+        return lock_file
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+class Dialer:
+    """Campaign dialer: a pool of async workers placing queued calls
+
+    Workers share a token bucket so the account never exceeds
+    ``calls_per_second``. A call that ends busy or unanswered is retried after
+    ``retry_delay`` seconds, up to ``max_attempts`` dials per job. Outcomes
+    arrive either in the ``place_call`` result or later through
+    ``handle_status`` (Twilio status callbacks).
+
+    A job interrupted while its call was being placed is never requeued
+    blindly, since the candidate may already be ringing. It is marked
+    ``needs-reconcile`` and, when the dialer next starts, ``lookup_call``
+    (phone number, dial time) is asked whether the call exists: the job then
+    tracks that call, or is requeued only if no call was placed. Without
+    ``lookup_call`` such jobs are left for manual review.
+
+    Under several server workers only one process dials: ``start`` takes an
+    exclusive lock next to the job database, and the other processes only
+    enqueue jobs and apply status callbacks, taking over if the leader exits.
+    That keeps the pacing limit account-wide instead of per worker.
+    """
+
+    def __init__(self,
+                 place_call: Callable[[str], Awaitable[Dict]],
+                 store: Optional[JobStore] = None,
+                 workers: Optional[int] = None,
+                 calls_per_second: Optional[float] = None,
+                 max_attempts: Optional[int] = None,
+                 retry_delay: Optional[float] = None,
+                 poll_interval: Optional[float] = None,
+                 lookup_call: Optional[Callable[[str, float], Awaitable[Optional[Dict]]]] = None):
+        self.place_call = place_call
+        self.lookup_call = lookup_call
+        # Opened on first use, i.e. after a preforking server has forked
+        self._store = store
+        self.workers = workers or DIALER_CONFIG['workers']
+        self.calls_per_second = calls_per_second or DIALER_CONFIG['calls_per_second']
+        self.max_attempts = max_attempts or DIALER_CONFIG['max_attempts']
+        self.retry_delay = retry_delay if retry_delay is not None else DIALER_CONFIG['retry_delay']
+        self.poll_interval = poll_interval or DIALER_CONFIG['poll_interval']
+        self.retry_statuses = DIALER_CONFIG['retry_statuses']
+        self.bucket = TokenBucket(self.calls_per_second)
+        self.lock_path = DIALER_CONFIG['lock_path']
+        self._lock_file = None
+        self._tasks: List[asyncio.Task] = []
+        self._standby_task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self.dialed = 0
+
+    @property
+    def store(self) -> JobStore:
+        if self._store is None:
+            self._store = JobStore(DIALER_CONFIG['db_path'])
+        return self._store
+
+    async def _db(self, func: Callable, *args, **kwargs):
+        """Run a job store call off the event loop"""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, lambda: func(*args, **kwargs))
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    @property
+    def is_leader(self) -> bool:
+        return self._lock_file is not None
+
+    async def start(self) -> None:
+        """Start dialing if no other process is; otherwise stand by to take over"""
+        if self.running or (self._standby_task is not None and not self._standby_task.done()):
+            return
+        self._wakeup = asyncio.Event()
+        await self._db(lambda: self.store)
+        if not await self._become_leader():
+            self._standby_task = asyncio.ensure_future(self._standby())
+
+    async def _become_leader(self) -> bool:
+        self._lock_file = _try_lock(self.lock_path)
+        if self._lock_file is None:
+            return False
+        print(f"Dialer leader in process {os.getpid()}")
+        await self._db(self.store.recover)
+        await self._reconcile()
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+        return True
+
+    async def _reconcile(self) -> None:
+        """Resolve jobs whose call may have been placed before an interruption"""
+        jobs = await self._db(self.store.unreconciled)
+        if not jobs:
+            return
+        if self.lookup_call is None:
+            print(f"Warning: {len(jobs)} dial jobs were interrupted while dialing and need manual review")
+            return
+        for job in jobs:
+            try:
+                call = await self.lookup_call(job["phone_number"], job["dialed_at"] or job["updated_at"])
+            except Exception as e:
+                print(f"Warning: Could not look up the call for dial job {job['id']}: {e}")
+                continue
+            if call is None:
+                # No call was placed: the attempt does not count
+                await self._db(self.store.update, job["id"], status=QUEUED, attempts=job["attempts"] - 1)
+                continue
+            call_status = await self._db(self.store.attach_call, job["id"], call["call_id"], call.get("status"))
+            if call_status in FINAL_CALL_STATUSES:
+                await self._finish(job, call_status)
+
+    async def _standby(self) -> None:
+        while not await self._become_leader():
+            await asyncio.sleep(DIALER_CONFIG['leader_retry'])
+
+    async def stop(self) -> None:
+        tasks = self._tasks + ([self._standby_task] if self._standby_task is not None else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._standby_task = None
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    async def enqueue(self, phone_numbers: List[str]) -> List[int]:
+        ids = await self._db(self.store.enqueue, phone_numbers)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return ids
+
+    async def get_job(self, job_id: int) -> Optional[Dict]:
+        return await self._db(self.store.get, job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            # Take the pacing token first, so a claimed job is dialed at once
+            # rather than sitting in "dialing" while it waits for its turn
+            await self.bucket.acquire()
+            job = await self._db(self.store.claim)
+            if job is None:
+                self.bucket.refund()
+                # Idle until new jobs arrive or a retry may have come due
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+
+            try:
+                call = await self.place_call(job["phone_number"])
+            except asyncio.CancelledError:
+                # Shutting down with the call request in flight: the candidate
+                # may be ringing, so the job is reconciled on the next start
+                await self._db(self.store.update, job["id"], status=NEEDS_RECONCILE)
+                raise
+            except Exception as e:
+                await self._finish(job, "failed", error=str(e))
+                continue
+
+            self.dialed += 1
+            # A status callback may have beaten the create response here
+            call_status = await self._db(self.store.attach_call, job["id"], call["call_id"], call.get("status"))
+            if call_status in FINAL_CALL_STATUSES:
+                await self._finish(job, call_status)
+
+    async def handle_status(self, call_id: str, call_status: str) -> Optional[Dict]:
+        """Apply a call status callback; returns the updated job, if the call is ours
+
+        A callback for a call whose SID the dialer has not stored yet is held
+        and applied as soon as the worker records the call.
+        """
+        job = await self._db(self.store.find_or_hold, call_id, call_status)
+        if job is None:
+            return None
+        if call_status in FINAL_CALL_STATUSES and job["status"] == IN_PROGRESS:
+            await self._finish(job, call_status)
+        else:
+            await self._db(self.store.update, job["id"], last_status=call_status)
+        return await self._db(self.store.get, job["id"])
+
+    async def _finish(self, job: Dict, call_status: str, error: Optional[str] = None) -> None:
+        if call_status == "completed":
+            await self._db(self.store.update, job["id"], status=COMPLETED, last_status=call_status)
+            return
+
+        # A failed request to place the call is retried like a busy line
+        retry = call_status in self.retry_statuses or error is not None
+        if retry and job["attempts"] < self.max_attempts:
+            await self._db(
+                self.store.update, job["id"],
+                status=QUEUED, last_status=call_status, last_error=error,
+                next_attempt_at=time.time() + self.retry_delay
+            )
+        else:
+            await self._db(self.store.update, job["id"], status=FAILED, last_status=call_status, last_error=error)
+
+    async def stats(self) -> Dict:
+        return {
+            "running": self.running,
+            "leader": self.is_leader,
+            "workers": self.workers,
+            "calls_per_second": self.calls_per_second,
+            "dialed": self.dialed,
+            "jobs": await self._db(self.store.counts)
+        }
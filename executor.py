@@ -0,0 +1,156 @@
+import asyncio
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional
+from config import EXECUTOR_CONFIG
+
+
+class ExecutorBusyError(Exception):
+    """Raised when the worker pool stays saturated past the queue timeout"""
+
+
+class BoundedExecutor:
+    """Thread or process pool for CPU-bound stages with a bounded admission queue
+
+    At most ``max_queue`` jobs are admitted (running plus waiting for a worker).
+    Further callers wait up to ``queue_timeout`` seconds for a slot and then get
+    an ExecutorBusyError, so the event loop never piles up unbounded work.
+    """
+
+    def __init__(self,
+                 kind: str = "thread",
+                 max_workers: int = 4,
+                 max_queue: int = 32,
+                 queue_timeout: Optional[float] = 5.0):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max(max_queue, max_workers)
+        self.queue_timeout = queue_timeout
+
+        self._pool: Optional[Executor] = None
+        self._pool_lock = threading.Lock()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop = None
+
+        self._admitted = 0
+        self._completed = 0
+        self._rejected = 0
+
+    @property
+    def is_process(self) -> bool:
+        """Whether jobs run in a separate process and must be picklable"""
+        return self.kind == "process"
+
+    def _get_pool(self) -> Executor:
+        """Create the worker pool on first use"""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    if self.is_process:
+                        self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+                    else:
+                        self._pool = ThreadPoolExecutor(
+                            max_workers=self.max_workers,
+                            thread_name_prefix="cpu-stage"
+                        )
+        return self._pool
+
+    def _get_slots(self, loop) -> asyncio.Semaphore:
+        """Admission semaphore bound to the running event loop"""
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_queue)
+            self._slots_loop = loop
+        return self._slots
+
+    async def run(self, func: Callable, *args: Any) -> Any:
+        """Run ``func(*args)`` in the pool without blocking the event loop"""
+        loop = asyncio.get_event_loop()
+        slots = self._get_slots(loop)
+
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._rejected += 1
+            raise ExecutorBusyError(
+                f"Worker pool saturated ({self.max_queue} jobs queued)"
+            )
+
+        self._admitted += 1
+        try:
+            return await loop.run_in_executor(self._get_pool(), func, *args)
+        finally:
+            self._admitted -= 1
+            self._completed += 1
+            slots.release()
+
+    def stats(self) -> Dict:
+        """Current load of the pool"""
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._admitted,
+            "completed": self._completed,
+            "rejected": self._rejected
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker pool"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=wait)
+                self._pool = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one underlying call
+
+    The first caller for a key starts the work; callers arriving while it is
+    still running await the same result instead of repeating it. A caller
+    that is cancelled or times out does not cancel the shared call.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Any, asyncio.Future] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def run(self, key: Any, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Await ``func()``, or the in-flight call already started for ``key``"""
+        call = self._calls.get(key)
+        if call is None:
+            call = asyncio.ensure_future(func())
+            self._calls[key] = call
+            self.started += 1
+            call.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(call)
+
+    def stats(self) -> Dict:
+        return {
+            "in_flight": len(self._calls),
+            "started": self.started,
+            "coalesced": self.coalesced
+        }
+
+
+_shared_executor: Optional[BoundedExecutor] = None
+_shared_lock = threading.Lock()
+
+
+def get_executor() -> BoundedExecutor:
+    """Process-wide executor built from EXECUTOR_CONFIG"""
+    global _shared_executor
+    if _shared_executor is None:
+        with _shared_lock:
+            if _shared_executor is None:
+                _shared_executor = BoundedExecutor(
+                    kind=EXECUTOR_CONFIG['kind'],
+                    max_workers=EXECUTOR_CONFIG['max_workers'],
+                    max_queue=EXECUTOR_CONFIG['max_queue'],
+                    queue_timeout=EXECUTOR_CONFIG['queue_timeout']
+                )
+    return _shared_executor
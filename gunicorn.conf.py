@@ -0,0 +1,40 @@
+# Run with: gunicorn -c gunicorn.conf.py main:app
+#
+# uvicorn --workers starts each worker with a fresh interpreter, so every worker
+# loads its own Whisper and transformer weights. gunicorn with preload_app
+# imports main once in the master; with PRELOAD_BEFORE_FORK=true the models in
+# PRELOAD_MODELS are loaded there and shared copy-on-write by all workers.
+import os
+
+# Set before config is imported so settings that depend on the worker count
+# (e.g. the session backend) see it
+os.environ.setdefault('WEB_CONCURRENCY', '4')
+
+from config import APP_CONFIG  # noqa: E402
+from model_loader import memory_usage  # noqa: E402
+
+bind = f"{APP_CONFIG['host']}:{APP_CONFIG['port']}"
+workers = APP_CONFIG['workers']
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+# gunicorn reads this file before it imports the app, so this is the master's
+# memory before preload (on_starting already runs after the preload)
+_memory_before_preload = memory_usage()
+
+
+def _format(usage: dict) -> str:
+    return ", ".join(f"{key}={value}" for key, value in usage.items())
+
+
+def when_ready(server):
+    server.log.info(f"Master memory before preload (kB): {_format(_memory_before_preload)}")
+    server.log.info(f"Master memory after preload (kB): {_format(memory_usage())}")
+
+
+def post_fork(server, worker):
+    server.log.info(f"Worker {worker.pid} memory at fork (kB): {_format(memory_usage())}")
+
+
+def post_worker_init(worker):
+    worker.log.info(f"Worker {worker.pid} memory after init (kB): {_format(memory_usage())}")
@@ -0,0 +1,103 @@
+import json
+import math
+import os
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+
+class KeyphraseExtractor:
+    """Noun-phrase keyphrase extraction ranked against a precomputed corpus
+
+    Candidates are maximal runs of adjectives followed by nouns (the same
+    ``<J.*>*<N.*>+`` pattern KeyphraseCountVectorizer uses), read from an
+    already parsed spaCy Doc in a single pass. They are ranked by TF-IDF using
+    a document-frequency table built once from past answers, so nothing is
+    refitted per transcript.
+    """
+
+    def __init__(self, df: Optional[Dict[str, int]] = None, num_docs: int = 0):
+        self.df = df or {}
+        self.num_docs = num_docs
+
+    @classmethod
+    def build(cls, docs: Iterable) -> "KeyphraseExtractor":
+        """Build the document-frequency table from parsed spaCy Docs"""
+        df = Counter()
+        num_docs = 0
+        for doc in docs:
+            num_docs += 1
+            df.update(set(cls.candidates(doc)))
+        return cls(dict(df), num_docs)
+
+    @classmethod
+    def load(cls, path: str) -> "KeyphraseExtractor":
+        """Load a table saved with save(); a missing file gives uniform weights"""
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data.get("df", {}), data.get("num_docs", 0))
+
+    def save(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump({"num_docs": self.num_docs, "df": self.df}, f)
+
+    @staticmethod
+    def candidates(doc) -> List[str]:
+        """Adjective* noun+ phrases in document order, lowercased"""
+        phrases = []
+        current = []
+        has_noun = False
+
+        for token in doc:
+            tag = token.tag_
+            if tag.startswith("NN"):
+                current.append(token.lower_)
+                has_noun = True
+            elif tag.startswith("JJ") and not has_noun:
+                current.append(token.lower_)
+            else:
+                if has_noun:
+                    phrases.append(" ".join(current))
+                # An adjective after a noun run starts the next candidate
+                current = [token.lower_] if tag.startswith("JJ") else []
+                has_noun = False
+
+        if has_noun:
+            phrases.append(" ".join(current))
+        return phrases
+
+    def idf(self, phrase: str) -> float:
+        """Smoothed inverse document frequency; unseen phrases rank highest"""
+        return math.log((1 + self.num_docs) / (1 + self.df.get(phrase, 0))) + 1.0
+
+    def extract(self, doc, top_n: int = 10, min_length: int = 3) -> List[str]:
+        """Top keyphrases of a parsed Doc by TF-IDF score"""
+        counts = Counter()
+        first_seen = {}
+        for position, phrase in enumerate(self.candidates(doc)):
+            if len(phrase) < min_length:
+                continue
+            counts[phrase] += 1
+            first_seen.setdefault(phrase, position)
+
+        ranked = sorted(
+            counts,
+            key=lambda phrase: (-counts[phrase] * self.idf(phrase), first_seen[phrase])
+        )
+        return ranked[:top_n]
+
+
+if __name__ == "__main__":
+    # Build the DF table from a corpus file with one answer per line:
+    #   python keyphrase_extractor.py answers.txt keyphrase_df.json
+    import sys
+    import spacy
+
+    corpus_path, output_path = sys.argv[1], sys.argv[2]
+    nlp = spacy.load("en_core_web_sm", disable=["ner"])
+    with open(corpus_path) as f:
+        answers = [line.strip() for line in f if line.strip()]
+    extractor = KeyphraseExtractor.build(nlp.pipe(answers, batch_size=64))
+    extractor.save(output_path)
+    print(f"Wrote {len(extractor.df)} phrases from {extractor.num_docs} answers to {output_path}")
@@ -1,7 +1,28 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import Dict, List, Optional
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from fastapi.staticfiles import StaticFiles
+from pydantic import BaseModel, Field, validator
+from typing import Dict, List, Optional, Union
 import uvicorn
+import asyncio
+import base64
+import json
+import os
+import time
+from urllib.parse import parse_qsl
+
+from config import MODEL_CONFIG, NLP_CONFIG, PROMPT_CONFIG
+from call_events import get_call_event_ingestor, handle_status_callback
+from dialer import Dialer
+from executor import ExecutorBusyError, get_executor
+from model_loader import memory_usage, registry
+from prompt_bundle import get_prompt_bundle
+from session_store import get_session_store, validate_session_backend
+from streaming_stt import StreamingTranscriber
+
+# Importing the real components only registers their lazy model loaders
+import nlp_analysis  # noqa: F401
+import speech_to_text  # noqa: F401
 
 # Import mock services instead of real ones
 from mock_services import (
@@ -13,12 +34,40 @@ from mock_services import (
 
 app = FastAPI(title="Voice AI HR Agent (Local Mock Version)")
 
+# Fail at startup, not mid-call, if sessions would be split across workers
+validate_session_backend()
+
+# Under a preforking server (see gunicorn.conf.py) load the weights once in the
+# parent so every worker shares them copy-on-write instead of loading its own copy
+if MODEL_CONFIG['preload_before_fork'] and MODEL_CONFIG['preload']:
+    preload_memory = registry.preload_before_fork(MODEL_CONFIG['preload'])
+    print(f"Preloaded {', '.join(MODEL_CONFIG['preload'])} before fork: "
+          f"RSS {preload_memory['before'].get('rss')} kB -> {preload_memory['after'].get('rss')} kB")
+
+# Pre-rendered prompt audio played by the call flow's <Play> verbs
+os.makedirs(PROMPT_CONFIG['bundle_dir'], exist_ok=True)
+app.mount(PROMPT_CONFIG['url_path'], StaticFiles(directory=PROMPT_CONFIG['bundle_dir']), name="prompts")
+
 # Initialize mock services
 twilio_service = MockTwilioService()
 tts_service = MockTTSService()
 stt_service = MockSTTService()
 nlp_service = MockNLPService()
 
+# Campaign dialer placing queued calls through the mock Twilio service. Its job
+# store is opened in the startup hook, after gunicorn forks, and only one worker
+# process dials at a time
+dialer = Dialer(place_call=twilio_service.make_call, lookup_call=twilio_service.find_call)
+
+# Status callbacks are acknowledged at once and stored in batches; the dialer
+# learns call outcomes from the stored events
+call_events = get_call_event_ingestor()
+
+async def _update_dialer(event: Dict) -> None:
+    await dialer.handle_status(event["call_sid"], event["status"])
+
+call_events.add_listener(_update_dialer)
+
 class CandidateResponse(BaseModel):
     candidate_name: str
     skills: List[str]
@@ -28,6 +77,32 @@ class CandidateResponse(BaseModel):
     decision: str
     reason: Optional[str]
 
+class WarmupRequest(BaseModel):
+    models: Optional[List[str]] = None
+
+class BatchAnalysisRequest(BaseModel):
+    texts: List[str]
+    batch_size: Optional[int] = Field(None, ge=1)
+
+# Upper bound on candidates x questions for one /simulate-interview request
+MAX_SIMULATED_ANSWERS = 2000
+
+class SimulationRequest(BaseModel):
+    candidates: int = Field(1, ge=1, le=500)
+    questions: int = Field(5, ge=1, le=20)
+    # Return {"results": [...per candidate], "timings": {...}} instead of the list of answers
+    include_timings: bool = False
+
+    @validator('questions')
+    def limit_total_answers(cls, questions, values):
+        candidates = values.get('candidates', 1)
+        if candidates * questions > MAX_SIMULATED_ANSWERS:
+            raise ValueError(f"candidates x questions must be at most {MAX_SIMULATED_ANSWERS}")
+        return questions
+
+class DialRequest(BaseModel):
+    phone_numbers: List[str]
+
 @app.get("/")
 async def root():
     return {"status": "Voice AI HR Agent Mock Service is running"}
@@ -41,35 +116,124 @@ async def initiate_call(phone_number: str) -> Dict:
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/dialer/jobs")
+async def enqueue_calls(request: DialRequest) -> Dict:
+    """Queue candidates for the campaign dialer"""
+    if not request.phone_numbers:
+        raise HTTPException(status_code=400, detail="phone_numbers must not be empty")
+    job_ids = await dialer.enqueue(request.phone_numbers)
+    return {"status": "queued", "job_ids": job_ids}
+
+@app.get("/dialer/jobs/{job_id}")
+async def get_dial_job(job_id: int) -> Dict:
+    job = await dialer.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown dial job")
+    return job
+
+@app.get("/dialer/stats")
+async def dialer_stats() -> Dict:
+    return await dialer.stats()
+
+@app.post("/call-status")
+async def call_status(request: Request) -> Dict:
+    """Twilio status callback (form-encoded CallSid and CallStatus)"""
+    form = dict(parse_qsl((await request.body()).decode()))
+    if "CallSid" not in form or "CallStatus" not in form:
+        raise HTTPException(status_code=400, detail="CallSid and CallStatus are required")
+    # Same path as CallHandler.handle_call_status: queue the event so Twilio
+    # gets its response immediately, and update the call's session
+    queued = handle_status_callback(form, call_events, get_session_store())
+    return {"status": "ok" if queued else "dropped"}
+
+@app.get("/call-events/stats")
+async def call_event_stats(window: float = 3600.0) -> Dict:
+    """Call outcomes and lifecycle timings over the last ``window`` seconds"""
+    stats = await asyncio.get_event_loop().run_in_executor(None, call_events.store.stats, window)
+    return {"calls": stats, "ingestion": call_events.stats()}
+
+@app.get("/call-events/{call_sid}")
+async def call_lifecycle(call_sid: str) -> Dict:
+    lifecycle = await asyncio.get_event_loop().run_in_executor(None, call_events.store.lifecycle, call_sid)
+    if lifecycle is None:
+        raise HTTPException(status_code=404, detail="Unknown call")
+    return lifecycle
+
 @app.post("/simulate-interview")
-async def simulate_interview() -> List[Dict]:
-    """Endpoint to simulate entire interview process"""
-    try:
-        interview_results = []
-        
-        # Simulate responses for each question
-        for i in range(5):  # 5 standard questions
+async def simulate_interview(request: Optional[SimulationRequest] = None) -> Union[List[Dict], Dict]:
+    """Simulate interviews for many candidates, analyzing every answer concurrently
+
+    Each answer's analysis stages run in the shared executor, so this doubles
+    as a load generator for the analysis path. Returns the list of analyzed
+    answers, or per-candidate results with aggregate timings when
+    ``include_timings`` is set.
+    """
+    request = request or SimulationRequest()
+    executor = get_executor()
+    # Each answer submits two jobs; keep the fan-out within the executor's queue
+    in_flight = asyncio.Semaphore(max(1, executor.max_queue // 2))
+    latencies: List[float] = []
+
+    async def analyze_answer(candidate: int, question: int) -> Dict:
+        async with in_flight:
             # Get mock response
-            response = twilio_service.get_response(i)
-            
-            # Analyze response
-            sentiment = nlp_service.analyze_sentiment(response)
-            keywords = nlp_service.extract_keywords(response)
-            
-            result = {
-                "question_index": i,
-                "response": response,
-                "analysis": {
-                    "sentiment": sentiment,
-                    "keywords": keywords
-                }
+            response = twilio_service.get_response(question % len(twilio_service.mock_responses))
+            start = time.perf_counter()
+            sentiment, keywords = await asyncio.gather(
+                executor.run(nlp_service.analyze_sentiment, response),
+                executor.run(nlp_service.extract_keywords, response)
+            )
+            latencies.append(round((time.perf_counter() - start) * 1000, 2))
+        answer = {
+            "question_index": question,
+            "response": response,
+            "analysis": {
+                "sentiment": sentiment,
+                "keywords": keywords
             }
-            interview_results.append(result)
-        
-        return interview_results
+        }
+        if request.candidates > 1:
+            answer["candidate_index"] = candidate
+        return answer
+
+    try:
+        start = time.perf_counter()
+        answers = await asyncio.gather(*[
+            analyze_answer(candidate, question)
+            for candidate in range(request.candidates)
+            for question in range(request.questions)
+        ])
+        wall = time.perf_counter() - start
+    except ExecutorBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    if not request.include_timings:
+        return answers
+
+    latencies.sort()
+    results = [
+        {
+            "candidate_index": candidate,
+            "responses": answers[candidate * request.questions:(candidate + 1) * request.questions]
+        }
+        for candidate in range(request.candidates)
+    ]
+    return {
+        "results": results,
+        "timings": {
+            "candidates": request.candidates,
+            "answers": len(answers),
+            "wall_seconds": round(wall, 4),
+            "answer_latency_ms_p50": latencies[len(latencies) // 2],
+            "answer_latency_ms_p95": latencies[int(len(latencies) * 0.95)],
+            "answer_latency_ms_max": latencies[-1],
+            "answers_per_second": round(len(answers) / wall, 1) if wall else None,
+            "executor": executor.stats()
+        }
+    }
+
 @app.post("/process-response")
 async def process_response(audio_data: bytes = b'') -> CandidateResponse:
     try:
@@ -93,9 +257,143 @@ async def process_response(audio_data: bytes = b'') -> CandidateResponse:
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/process-responses")
+async def process_responses(request: BatchAnalysisRequest) -> List[Dict]:
+    """Bulk-analyze transcribed answers, results in request order
+
+    Same call as NLPAnalyzer.analyze_batch: the whole batch runs in the shared
+    executor, off the event loop.
+    """
+    try:
+        batch_size = request.batch_size or NLP_CONFIG['batch_size']
+        analyses = await nlp_service.analyze_batch(request.texts, batch_size=batch_size)
+        return [
+            {"index": i, "response": text, "analysis": analysis}
+            for i, (text, analysis) in enumerate(zip(request.texts, analyses))
+        ]
+    except ExecutorBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/tts/stream")
+async def stream_speech(text: str):
+    """Synthesized speech for ``text``, sent chunk by chunk as it is produced"""
+    if not text.strip():
+        raise HTTPException(status_code=400, detail="text must not be empty")
+    return StreamingResponse(tts_service.synthesize_stream(text), media_type="audio/mpeg")
+
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "mode": "mock"}
+    return {"status": "healthy", "mode": "mock", "executor": get_executor().stats()}
+
+@app.websocket("/media-stream")
+async def media_stream(websocket: WebSocket, transcripts: bool = False):
+    """Twilio Media Streams endpoint: live partial and final transcripts
+
+    Pass ``?transcripts=1`` to have transcript events sent back on the socket
+    (used by test clients; Twilio itself does not expect them).
+    """
+    await websocket.accept()
+    call_sid = None
+    sessions = get_session_store()
+
+    async def emit(event: Dict) -> None:
+        event["call_sid"] = call_sid
+        if event["type"] == "final" and call_sid:
+            # Kept with the call, not in the server log: transcripts are candidate data
+            session = sessions.get_or_create(call_sid)
+            session.stream_transcripts[event["utterance"]] = event["text"]
+            sessions.put(session)
+        if transcripts:
+            try:
+                await websocket.send_text(json.dumps(event))
+            except Exception:
+                # Client already hung up
+                pass
+
+    transcriber = StreamingTranscriber(stt_service.transcribe_audio, emit)
+    try:
+        while True:
+            message = json.loads(await websocket.receive_text())
+            event = message.get("event")
+            if event == "start":
+                call_sid = message["start"].get("callSid")
+            elif event == "media":
+                await transcriber.feed(base64.b64decode(message["media"]["payload"]))
+            elif event == "stop":
+                await transcriber.close()
+                break
+    except WebSocketDisconnect:
+        await transcriber.close()
+        return
+    await websocket.close()
+
+@app.post("/warmup")
+async def warmup(request: Optional[WarmupRequest] = None) -> Dict:
+    """Start loading models in the background
+
+    Defaults to PRELOAD_MODELS, or else the models the configured components
+    use; other registered models load only when named.
+    """
+    names = request.models if request and request.models is not None else (MODEL_CONFIG['preload'] or None)
+    try:
+        registry.warmup(names)
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=e.args[0])
+    return {"status": "warming", "models": registry.status()}
+
+@app.get("/warmup")
+async def warmup_status() -> Dict:
+    return {"models": registry.status()}
+
+@app.get("/models/memory")
+async def model_memory() -> Dict:
+    """Memory of the worker serving this request and of each loaded model"""
+    return {"worker": memory_usage(), "models": registry.load_report()}
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: ready once every model listed in PRELOAD_MODELS is loaded"""
+    if not registry.is_ready(MODEL_CONFIG['preload']):
+        raise HTTPException(status_code=503, detail={"models": registry.status()})
+    return {"status": "ready"}
+
+@app.on_event("startup")
+async def preload_models():
+    if MODEL_CONFIG['preload']:
+        registry.warmup(MODEL_CONFIG['preload'])
+
+@app.on_event("startup")
+async def prerender_prompts():
+    if not PROMPT_CONFIG['prerender_on_startup']:
+        return
+
+    async def _render():
+        try:
+            from text_to_speech import TextToSpeech
+            # The call flow's bundle, so its TwiML switches to <Play> once rendered
+            rendered = await get_prompt_bundle().build(TextToSpeech())
+            print(f"Pre-rendered {len(rendered)} interview prompts")
+        except Exception as e:
+            print(f"Warning: Could not pre-render prompts, calls will use <Say>: {e}")
+
+    # Render in the background so startup is not held up by synthesis
+    asyncio.ensure_future(_render())
+
+@app.on_event("startup")
+async def start_dialer():
+    call_events.start()
+    await dialer.start()
+
+@app.on_event("shutdown")
+async def stop_dialer():
+    await dialer.stop()
+    await call_events.stop()
+
+@app.on_event("shutdown")
+async def shutdown_executor():
+    get_executor().shutdown(wait=False)
 
 if __name__ == "__main__":
     print("Starting Voice AI HR Agent in Mock Mode...")
@@ -1,10 +1,21 @@
 from typing import Dict, Optional, List
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import asyncio
+import io
 import json
 import random
+import struct
+import threading
+import time
+import wave
 
 class MockTwilioService:
-    def __init__(self):
+    def __init__(self, outcomes: Optional[Dict[str, float]] = None, latency: float = 0.0):
+        """``outcomes`` maps call statuses to their probability; calls complete by default"""
         self.call_id = 0
+        self.outcomes = outcomes or {"completed": 1.0}
+        self.latency = latency
+        self.calls: List[Dict] = []
         self.mock_responses = [
             "Hi, I'm John Smith. I have 5 years of experience in software development.",
             "My key skills are Python, React, and Cloud technologies.",
@@ -16,10 +27,22 @@ class MockTwilioService:
     async def make_call(self, phone_number: str) -> Dict:
         """Simulate making a phone call"""
         self.call_id += 1
-        return {
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        status = random.choices(list(self.outcomes), weights=list(self.outcomes.values()))[0]
+        call = {
             "call_id": f"mock_call_{self.call_id}",
-            "status": "completed"
+            "status": status
         }
+        self.calls.append({"to": phone_number, "at": time.time(), **call})
+        return call
+
+    async def find_call(self, phone_number: str, since: float) -> Optional[Dict]:
+        """Latest call placed to ``phone_number`` at or after ``since``, if any"""
+        for call in reversed(self.calls):
+            if call["to"] == phone_number and call["at"] >= since:
+                return {"call_id": call["call_id"], "status": call["status"]}
+        return None
 
     def get_response(self, question_index: int) -> str:
         """Get mock response for a question"""
@@ -32,6 +55,56 @@ class MockTTSService:
         """Mock text-to-speech conversion"""
         return b'mock_audio_data'
 
+    async def synthesize_stream(self, text: str, chunk_size: Optional[int] = None):
+        """Mock streaming synthesis: one chunk per sentence"""
+        import re
+        for sentence in re.split(r'(?<=[.!?])\s+', text.strip()):
+            yield b'mock_audio_data|' + sentence.encode()
+
+class FakeTTSClient:
+    """Stand-in for texttospeech.TextToSpeechClient that never leaves the process
+
+    Returns deterministic audio per request and counts upstream calls, so
+    caching and request coalescing can be checked without Google Cloud.
+    """
+    def __init__(self,
+                 latency: float = 0.0,
+                 voices: Optional[List[Dict]] = None,
+                 latency_per_char: float = 0.0):
+        self.latency = latency
+        self.latency_per_char = latency_per_char
+        self.calls = 0
+        self.list_calls = 0
+        self.voices = voices if voices is not None else [
+            {"name": "en-US-Standard-I", "language_codes": ["en-US"], "ssml_gender": "FEMALE"},
+            {"name": "en-US-Standard-J", "language_codes": ["en-US"], "ssml_gender": "MALE"},
+            {"name": "en-GB-Standard-A", "language_codes": ["en-GB"], "ssml_gender": "FEMALE"}
+        ]
+
+    def synthesize_speech(self, input, voice, audio_config, **kwargs):
+        from types import SimpleNamespace
+        self.calls += 1
+        content = input.ssml or input.text
+        # Upstream synthesis time grows with the length of the input
+        delay = self.latency + self.latency_per_char * len(content)
+        if delay:
+            time.sleep(delay)
+        audio = b'ID3\x03\x00\x00\x00\x00\x00\x00' + f"{voice.name}|{audio_config.speaking_rate}|{content}".encode()
+        return SimpleNamespace(audio_content=audio)
+
+    def list_voices(self, **kwargs):
+        from types import SimpleNamespace
+        from google.cloud import texttospeech
+        self.list_calls += 1
+        return SimpleNamespace(voices=[
+            SimpleNamespace(
+                name=voice["name"],
+                language_codes=voice["language_codes"],
+                ssml_gender=texttospeech.SsmlVoiceGender[voice["ssml_gender"]]
+            )
+            for voice in self.voices
+        ])
+
 class MockSTTService:
     async def transcribe(self, audio: bytes) -> Dict[str, str]:
         """Mock speech-to-text conversion"""
@@ -47,6 +120,13 @@ class MockSTTService:
             "language": "en"
         }
 
+    async def transcribe_audio(self, audio) -> Dict[str, str]:
+        """Mock transcription of 16 kHz samples"""
+        return {
+            "text": f"mock transcript of {len(audio) / 16000:.1f} seconds of audio",
+            "language": "en"
+        }
+
 class MockNLPService:
     def analyze_sentiment(self, text: str) -> str:
         """Mock sentiment analysis"""
@@ -75,4 +155,174 @@ class MockNLPService:
             if word in tech_skills or word in soft_skills:
                 keywords.append(word.title())
         
-        return list(set(keywords))
\ No newline at end of file
+        return list(set(keywords))
+
+    async def analyze_batch(self, texts: List[str], batch_size: Optional[int] = None) -> List[Dict]:
+        """Mock of NLPAnalyzer.analyze_batch: the batch runs in the shared executor"""
+        from executor import get_executor
+        return await get_executor().run(self.analyze_batch_sync, list(texts), batch_size)
+
+    def analyze_batch_sync(self, texts: List[str], batch_size: Optional[int] = None) -> List[Dict]:
+        """Mock batched analysis, results in input order"""
+        batch_size = batch_size or 32
+        results = []
+        for start in range(0, len(texts), batch_size):
+            for text in texts[start:start + batch_size]:
+                results.append({
+                    "sentiment": self.analyze_sentiment(text),
+                    "keywords": self.extract_keywords(text)
+                })
+        return results
+
+def make_wav(seconds: float = 1.0, sample_rate: int = 16000, frequency: float = 440.0) -> bytes:
+    """Build a mono 16-bit PCM WAV containing a sine tone"""
+    import math
+    frames = int(seconds * sample_rate)
+    samples = (
+        int(12000 * math.sin(2 * math.pi * frequency * i / sample_rate))
+        for i in range(frames)
+    )
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(struct.pack(f"<{frames}h", *samples))
+    return buffer.getvalue()
+
+class MockAudioServer:
+    """Local HTTP server that serves WAV recordings, standing in for Twilio
+
+    ``fail_first`` makes each path answer 503 that many times before serving
+    it, and ``delay`` stalls every response, to exercise retries and timeouts.
+
+        with MockAudioServer({"/answer.wav": make_wav(2.0)}) as server:
+            audio = await downloader.download(server.url("/answer.wav"))
+    """
+    def __init__(self, files: Optional[Dict[str, bytes]] = None, fail_first: int = 0, delay: float = 0.0):
+        self.files = files or {"/recording.wav": make_wav()}
+        self.fail_first = fail_first
+        self.delay = delay
+        self.requests = 0
+        self.connections = 0
+        self._failures: Dict[str, int] = {}
+        self._server = None
+        self._thread = None
+
+    def url(self, path: str = "/recording.wav") -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{path}"
+
+    def start(self) -> "MockAudioServer":
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # HTTP/1.1 so clients can keep the connection alive between requests
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                stub.connections += 1
+
+            def do_GET(self):
+                stub.requests += 1
+                if stub.delay:
+                    time.sleep(stub.delay)
+                body = stub.files.get(self.path)
+                if body is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                if stub._failures.get(self.path, 0) < stub.fail_first:
+                    stub._failures[self.path] = stub._failures.get(self.path, 0) + 1
+                    self.send_response(503)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "audio/wav")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client gave up (e.g. its read timeout fired first)
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "MockAudioServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+async def replay_media_stream(url: str, audio: bytes, realtime: bool = True, call_sid: str = "mock_call") -> List[Dict]:
+    """Replay a recorded WAV into a media-stream WebSocket the way Twilio does
+
+    The audio is converted to 8 kHz mu-law and sent as 20 ms ``media`` frames
+    between ``start`` and ``stop`` events. Returns every transcript event the
+    server sent back (connect with ``?transcripts=1`` to have them echoed).
+    """
+    import asyncio
+    import base64
+    import websockets
+    from audio import decode_wav, mulaw_encode
+
+    samples = decode_wav(audio, target_rate=8000)
+    if samples is None:
+        raise ValueError("Replay audio must be a WAV file")
+    payload = mulaw_encode(samples)
+    frame_bytes = 160  # 20 ms at 8 kHz
+    stream_sid = f"MZ{call_sid}"
+    events: List[Dict] = []
+
+    async with websockets.connect(url) as socket:
+        async def receive():
+            async for message in socket:
+                events.append(json.loads(message))
+
+        receiver = asyncio.ensure_future(receive())
+        await socket.send(json.dumps({"event": "connected", "protocol": "Call", "version": "1.0.0"}))
+        await socket.send(json.dumps({
+            "event": "start",
+            "streamSid": stream_sid,
+            "start": {
+                "streamSid": stream_sid,
+                "callSid": call_sid,
+                "mediaFormat": {"encoding": "audio/x-mulaw", "sampleRate": 8000, "channels": 1}
+            }
+        }))
+        for chunk, offset in enumerate(range(0, len(payload), frame_bytes)):
+            await socket.send(json.dumps({
+                "event": "media",
+                "streamSid": stream_sid,
+                "media": {
+                    "chunk": str(chunk + 1),
+                    "timestamp": str(chunk * 20),
+                    "payload": base64.b64encode(payload[offset:offset + frame_bytes]).decode()
+                }
+            }))
+            if realtime:
+                await asyncio.sleep(0.02)
+        await socket.send(json.dumps({"event": "stop", "streamSid": stream_sid}))
+        try:
+            # The server closes the socket once the final transcript is sent
+            await asyncio.wait_for(receiver, timeout=30)
+        except asyncio.TimeoutError:
+            receiver.cancel()
+
+    return events
\ No newline at end of file
@@ -0,0 +1,192 @@
+import gc
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+def memory_usage() -> Dict[str, int]:
+    """Memory of the current process in kB
+
+    On Linux ``pss`` splits pages shared with other processes (such as model
+    weights inherited from a preloading parent) evenly between them, so it is
+    the fair per-worker figure; ``rss`` counts shared pages in full.
+    """
+    usage = {"pid": os.getpid()}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            fields = {
+                "Rss": "rss", "Pss": "pss",
+                "Shared_Clean": "shared_clean", "Shared_Dirty": "shared_dirty",
+                "Private_Clean": "private_clean", "Private_Dirty": "private_dirty"
+            }
+            for line in f:
+                key = line.split(":", 1)[0]
+                if key in fields:
+                    usage[fields[key]] = int(line.split()[1])
+    except OSError:
+        # Non-Linux fallback: peak resident set size only (unavailable on Windows)
+        try:
+            import resource
+            usage["max_rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        except ImportError:
+            pass
+    return usage
+
+
+class LazyModel:
+    """Model loaded on first use, at most once, behind a lock"""
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        self.name = name
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._model = None
+        self._error: Optional[Exception] = None
+        self._loading = False
+        self.load_seconds: Optional[float] = None
+        self.rss_delta_kb: Optional[int] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def get(self) -> Any:
+        """Return the model, loading it on the first call"""
+        if self._model is not None:
+            return self._model
+
+        with self._lock:
+            if self._model is None:
+                if self._error is not None:
+                    raise RuntimeError(f"Model '{self.name}' failed to load: {self._error}")
+                self._loading = True
+                start = time.perf_counter()
+                rss_before = memory_usage().get("rss")
+                try:
+                    self._model = self._factory()
+                    self.load_seconds = time.perf_counter() - start
+                    rss_after = memory_usage().get("rss")
+                    if rss_before is not None and rss_after is not None:
+                        self.rss_delta_kb = rss_after - rss_before
+                except Exception as e:
+                    self._error = e
+                    print(f"Warning: Could not load model '{self.name}': {e}")
+                    raise RuntimeError(f"Model '{self.name}' failed to load: {e}")
+                finally:
+                    self._loading = False
+        return self._model
+
+    def reset_error(self) -> None:
+        """Forget a previous load failure so the next get() retries"""
+        with self._lock:
+            self._error = None
+
+    def status(self) -> str:
+        if self._model is not None:
+            return "loaded"
+        if self._loading:
+            return "loading"
+        if self._error is not None:
+            return f"failed: {self._error}"
+        return "not_loaded"
+
+
+class ModelRegistry:
+    """Process-wide set of lazily loaded models, shared by every component"""
+
+    def __init__(self):
+        self._models: Dict[str, LazyModel] = {}
+        self._required: List[str] = []
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory: Callable[[], Any]) -> LazyModel:
+        """Register a model factory; registering an existing name is a no-op"""
+        with self._lock:
+            if name not in self._models:
+                self._models[name] = LazyModel(name, factory)
+            return self._models[name]
+
+    def require(self, *names: str) -> None:
+        """Mark registered models as used by the configured components"""
+        with self._lock:
+            for name in names:
+                if name not in self._models:
+                    raise KeyError(f"Unknown model: {name}")
+                if name not in self._required:
+                    self._required.append(name)
+
+    def required(self) -> List[str]:
+        return list(self._required)
+
+    def lazy(self, name: str) -> LazyModel:
+        if name not in self._models:
+            raise KeyError(f"Unknown model: {name}")
+        return self._models[name]
+
+    def get(self, name: str) -> Any:
+        """Return a loaded model, loading it on first use"""
+        return self.lazy(name).get()
+
+    def names(self) -> List[str]:
+        return list(self._models)
+
+    def status(self) -> Dict[str, str]:
+        return {name: model.status() for name, model in self._models.items()}
+
+    def is_ready(self, names: Iterable[str]) -> bool:
+        """Whether every named model has finished loading"""
+        return all(name in self._models and self._models[name].loaded for name in names)
+
+    def warmup(self, names: Optional[Iterable[str]] = None, background: bool = True) -> Optional[threading.Thread]:
+        """Preload models, by default in a daemon thread so the app keeps serving
+
+        Without ``names`` only the models the configured components require are
+        loaded; any other registered model has to be named explicitly.
+        """
+        names = list(names) if names is not None else self.required()
+        unknown = [name for name in names if name not in self._models]
+        if unknown:
+            raise KeyError(f"Unknown models: {', '.join(unknown)}")
+
+        def _load_all():
+            for name in names:
+                model = self._models[name]
+                model.reset_error()
+                try:
+                    model.get()
+                except Exception:
+                    # Failure is recorded on the model and reported via status()
+                    pass
+
+        if not background:
+            _load_all()
+            return None
+
+        thread = threading.Thread(target=_load_all, name="model-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def preload_before_fork(self, names: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, int]]:
+        """Load models in a parent process so forked workers share the weights
+
+        Must run before the server forks its workers (e.g. gunicorn with
+        ``preload_app``). Freezing the GC afterwards keeps collections in the
+        children from touching the inherited objects and un-sharing their pages.
+        """
+        before = memory_usage()
+        self.warmup(names, background=False)
+        gc.collect()
+        gc.freeze()
+        return {"before": before, "after": memory_usage()}
+
+    def load_report(self) -> Dict[str, Dict]:
+        """Load time and resident memory growth per loaded model"""
+        return {
+            name: {"load_seconds": model.load_seconds, "rss_delta_kb": model.rss_delta_kb}
+            for name, model in self._models.items()
+            if model.loaded
+        }
+
+
+registry = ModelRegistry()
@@ -1,92 +1,245 @@
-from transformers import pipeline
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from keyphrase_vectorizers import KeyphraseCountVectorizer
-from typing import Dict, List, Tuple
-import spacy
+from typing import Dict, Iterable, List, Optional, Tuple
+from config import NLP_CONFIG, TONE_RULES
+from executor import BoundedExecutor, ExecutorBusyError, get_executor
+from keyphrase_extractor import KeyphraseExtractor
+from tone_rules import ToneRuleEngine
+from model_loader import LazyModel, registry
 import re
 
+SENTIMENT_STRATEGIES = ("vader", "transformer", "ensemble")
+EXPERIENCE_PATTERN = re.compile(r'\b(\d+)\s*(?:years?|yrs?)\b')
+
+
+# Heavy libraries are imported inside the loaders so importing this module stays cheap
+def _load_sentiment_pipeline():
+    from transformers import pipeline
+    return pipeline("sentiment-analysis")
+
+
+def _load_vader():
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    return SentimentIntensityAnalyzer()
+
+
+def _load_keyphrase_extractor():
+    return KeyphraseExtractor.load(NLP_CONFIG['keyphrase_df_path'])
+
+
+def _load_spacy():
+    import spacy
+    return spacy.load("en_core_web_sm")
+
+
+registry.register("sentiment-transformer", _load_sentiment_pipeline)
+registry.register("sentiment-vader", _load_vader)
+registry.register("keyphrase-extractor", _load_keyphrase_extractor)
+registry.register("spacy", _load_spacy)
+# Warmed by default: the sentiment models of the configured strategy, spaCy and keyphrases
+registry.require("spacy", "keyphrase-extractor")
+if NLP_CONFIG['sentiment_strategy'] in ("vader", "ensemble"):
+    registry.require("sentiment-vader")
+if NLP_CONFIG['sentiment_strategy'] in ("transformer", "ensemble"):
+    registry.require("sentiment-transformer")
+
+class AnalysisContext:
+    """Per-request state shared by the analysis stages of a single transcript"""
+    def __init__(self, text: str, nlp=None, doc=None, transformer_sentiment: Optional[Dict] = None):
+        self.text = text
+        self._nlp = nlp
+        self._doc = doc
+        # Precomputed by analyze_batch so single answers skip their own forward pass
+        self.transformer_sentiment = transformer_sentiment
+
+    @property
+    def doc(self):
+        """spaCy Doc for the transcript, parsed at most once per request"""
+        if self._doc is None:
+            if self._nlp is None:
+                raise RuntimeError("spaCy model is not loaded")
+            # Accept either a loaded pipeline or a LazyModel wrapping one
+            nlp = self._nlp.get() if isinstance(self._nlp, LazyModel) else self._nlp
+            self._doc = nlp(self.text)
+        return self._doc
+
 class NLPAnalyzer:
-    def __init__(self):
+    def __init__(self, executor: Optional[BoundedExecutor] = None):
         """Initialize NLP components"""
-        try:
-            # Load sentiment analysis pipeline
-            self.sentiment_pipeline = pipeline("sentiment-analysis")
-            # Load VADER for additional sentiment analysis
-            self.vader = SentimentIntensityAnalyzer()
-            # Initialize keyword extractor
-            self.keyword_extractor = KeyphraseCountVectorizer()
-            # Load spaCy model for named entity recognition
-            self.nlp = spacy.load("en_core_web_sm")
-        except Exception as e:
-            print(f"Warning: Could not initialize some NLP components: {e}")
+        # Inference runs in a worker pool so it never blocks the event loop
+        self.executor = executor or get_executor()
+        # Only the models used by the configured strategy are ever loaded
+        self.sentiment_strategy = NLP_CONFIG['sentiment_strategy']
+        if self.sentiment_strategy not in SENTIMENT_STRATEGIES:
+            raise ValueError(f"Unknown sentiment strategy: {self.sentiment_strategy}")
+        # Tone phrases are compiled once, not per answer
+        self.tone_rules = ToneRuleEngine(TONE_RULES)
+
+    @property
+    def uses_transformer(self) -> bool:
+        return self.sentiment_strategy in ("transformer", "ensemble")
+
+    @property
+    def sentiment_pipeline(self):
+        """HuggingFace sentiment pipeline, loaded on first use"""
+        return registry.get("sentiment-transformer")
+
+    @property
+    def vader(self):
+        """VADER analyzer, loaded on first use"""
+        return registry.get("sentiment-vader")
+
+    @property
+    def keyword_extractor(self) -> KeyphraseExtractor:
+        """Keyphrase extractor with its corpus DF table, loaded on first use"""
+        return registry.get("keyphrase-extractor")
+
+    @property
+    def nlp(self):
+        """spaCy pipeline for named entity recognition, loaded on first use"""
+        return registry.get("spacy")
 
     async def analyze(self, text: str) -> Dict:
         """Perform comprehensive NLP analysis on text"""
         try:
-            sentiment = await self._analyze_sentiment(text)
-            keywords = await self._extract_keywords(text)
-            entities = await self._extract_entities(text)
-            tone_flags = await self._check_tone(text)
-
-            return {
-                "sentiment": sentiment,
-                "keywords": keywords,
-                "entities": entities,
-                "tone_flags": tone_flags,
-                "extracted_info": self._extract_candidate_info(text)
-            }
+            if self.executor.is_process:
+                return await self.executor.run(_analyze_in_worker, text)
+            return await self.executor.run(self.analyze_sync, text)
 
+        except ExecutorBusyError:
+            raise
         except Exception as e:
             return {"error": str(e)}
 
-    async def _analyze_sentiment(self, text: str) -> str:
-        """Analyze sentiment using both transformers and VADER"""
+    async def analyze_batch(self, texts: Iterable[str], batch_size: Optional[int] = None) -> List[Dict]:
+        """Analyze many transcripts, batching the spaCy and transformer passes
+
+        Results are returned in the same order as the input texts.
+        """
+        texts = list(texts)
+        if self.executor.is_process:
+            return await self.executor.run(_analyze_batch_in_worker, texts, batch_size)
+        return await self.executor.run(self.analyze_batch_sync, texts, batch_size)
+
+    def analyze_sync(self, text: str) -> Dict:
+        """Blocking analysis of a single transcript, run inside the worker pool"""
         try:
-            # Get transformer-based sentiment
-            transformer_sentiment = self.sentiment_pipeline(text)[0]
-            
-            # Get VADER sentiment
-            vader_scores = self.vader.polarity_scores(text)
-            
-            # Combine both analyses
-            compound_score = vader_scores['compound']
-            
-            if compound_score >= 0.5:
-                return "Very Positive"
-            elif compound_score > 0:
-                return "Positive"
-            elif compound_score == 0:
-                return "Neutral"
-            elif compound_score > -0.5:
-                return "Negative"
+            # Parse the transcript once and share the Doc across spaCy stages
+            context = AnalysisContext(text, registry.lazy("spacy"))
+            return self._analyze_context(context)
+
+        except Exception as e:
+            return {"error": str(e)}
+
+    def analyze_batch_sync(self, texts: List[str], batch_size: Optional[int] = None) -> List[Dict]:
+        """Blocking batched analysis, run inside the worker pool"""
+        batch_size = batch_size or NLP_CONFIG['batch_size']
+        nlp = registry.lazy("spacy")
+
+        # Stream all transcripts through spaCy in one pass
+        docs = [None] * len(texts)
+        try:
+            docs = list(self.nlp.pipe(texts, batch_size=batch_size))
+        except Exception as e:
+            print(f"Warning: Batched spaCy parse failed, parsing per transcript: {e}")
+
+        # Batch the transformer forward passes
+        transformer_sentiments = [None] * len(texts)
+        if self.uses_transformer:
+            try:
+                transformer_sentiments = self.sentiment_pipeline(texts, batch_size=batch_size, truncation=True)
+            except Exception as e:
+                print(f"Warning: Batched sentiment pipeline failed: {e}")
+
+        results = []
+        for text, doc, transformer_sentiment in zip(texts, docs, transformer_sentiments):
+            context = AnalysisContext(text, nlp, doc=doc, transformer_sentiment=transformer_sentiment)
+            try:
+                results.append(self._analyze_context(context))
+            except Exception as e:
+                results.append({"error": str(e)})
+
+        return results
+
+    def _analyze_context(self, context: AnalysisContext) -> Dict:
+        """Run every analysis stage against a prepared context"""
+        text = context.text
+        sentiment = self._analyze_sentiment(context)
+        keywords = self._extract_keywords(context)
+        entities = self._extract_entities(context)
+        tone_flags, tone_matches = self._check_tone(text)
+
+        return {
+            "sentiment": sentiment,
+            "keywords": keywords,
+            "entities": entities,
+            "tone_flags": tone_flags,
+            "tone_matches": tone_matches,
+            "extracted_info": self._extract_candidate_info(context)
+        }
+
+    def _analyze_sentiment(self, context: AnalysisContext) -> str:
+        """Analyze sentiment with the configured strategy (VADER, transformer or both)"""
+        text = context.text
+        try:
+            if self.sentiment_strategy == "vader":
+                score = self._vader_score(text)
+            elif self.sentiment_strategy == "transformer":
+                score = self._transformer_score(context)
             else:
-                return "Very Negative"
+                # Fuse both polarity scores with the configured weights
+                weights = NLP_CONFIG['ensemble_weights']
+                score = (
+                    weights['vader'] * self._vader_score(text) +
+                    weights['transformer'] * self._transformer_score(context)
+                ) / (weights['vader'] + weights['transformer'])
+
+            return self._label_sentiment(score)
 
         except Exception:
             # Fallback to basic sentiment analysis
             return self._basic_sentiment_analysis(text)
 
-    async def _extract_keywords(self, text: str) -> List[str]:
-        """Extract key phrases and important terms"""
+    def _vader_score(self, text: str) -> float:
+        """VADER compound polarity in [-1, 1]"""
+        return self.vader.polarity_scores(text)['compound']
+
+    def _transformer_score(self, context: AnalysisContext) -> float:
+        """Transformer polarity in [-1, 1], reusing a batched result when present"""
+        result = context.transformer_sentiment or self.sentiment_pipeline(context.text, truncation=True)[0]
+        positive_probability = result['score']
+        if not result['label'].upper().startswith('POS'):
+            positive_probability = 1.0 - positive_probability
+        return 2.0 * positive_probability - 1.0
+
+    def _label_sentiment(self, score: float) -> str:
+        """Map a polarity score in [-1, 1] to a sentiment label"""
+        if abs(score) < NLP_CONFIG['neutral_band']:
+            return "Neutral"
+        elif score >= 0.5:
+            return "Very Positive"
+        elif score > 0:
+            return "Positive"
+        elif score > -0.5:
+            return "Negative"
+        else:
+            return "Very Negative"
+
+    def _extract_keywords(self, context: AnalysisContext) -> List[str]:
+        """Extract key phrases ranked against the corpus DF table"""
         try:
-            # Extract keyphrases
-            keyphrases = self.keyword_extractor.fit([text]).get_feature_names_out()
-            
-            # Filter and clean keyphrases
-            cleaned_keyphrases = [
-                phrase.strip() for phrase in keyphrases
-                if len(phrase.strip()) > 2  # Remove very short phrases
-            ]
-            
-            return cleaned_keyphrases[:10]  # Return top 10 keyphrases
+            # Reuses the shared Doc, nothing is refitted per answer
+            return self.keyword_extractor.extract(
+                context.doc,
+                top_n=NLP_CONFIG['max_keywords'],
+                min_length=NLP_CONFIG['keyword_min_length']
+            )
 
         except Exception:
-            return self._basic_keyword_extraction(text)
+            return self._basic_keyword_extraction(context.text)
 
-    async def _extract_entities(self, text: str) -> Dict[str, List[str]]:
+    def _extract_entities(self, context: AnalysisContext) -> Dict[str, List[str]]:
         """Extract named entities using spaCy"""
         try:
-            doc = self.nlp(text)
+            doc = context.doc
             entities = {}
             
             for ent in doc.ents:
@@ -99,35 +252,23 @@ class NLPAnalyzer:
         except Exception:
             return {}
 
-    async def _check_tone(self, text: str) -> List[str]:
-        """Check for potential tone issues or red flags"""
-        flags = []
-        
-        # Check for negative patterns
-        negative_patterns = [
-            r'\b(never|no|not|cannot|won\'t)\b',
-            r'\b(hate|dislike|awful|terrible)\b',
-            r'\b(impossible|difficult|hard|problem)\b'
-        ]
-
-        for pattern in negative_patterns:
-            if re.search(pattern, text.lower()):
-                flags.append("Negative language detected")
-                break
-
-        # Check for vague responses
-        vague_words = ['maybe', 'somewhat', 'kind of', 'sort of', 'i guess']
-        if any(word in text.lower() for word in vague_words):
-            flags.append("Vague response")
+    def _check_tone(self, text: str) -> Tuple[List[str], List[Dict]]:
+        """Check for potential tone issues or red flags
+
+        Returns the raised flags and the phrase matches (with offsets) behind them.
+        """
+        # One pass over the text for every configured phrase rule
+        flags, matches = self.tone_rules.flags(text)
 
         # Check response length
-        if len(text.split()) < 5:
+        if len(text.split()) < NLP_CONFIG['short_response_words']:
             flags.append("Very short response")
 
-        return flags
+        return flags, matches
 
-    def _extract_candidate_info(self, text: str) -> Dict:
+    def _extract_candidate_info(self, context: AnalysisContext) -> Dict:
         """Extract specific candidate information"""
+        text = context.text
         info = {
             "name": None,
             "experience": None,
@@ -136,7 +277,7 @@ class NLPAnalyzer:
         }
 
         try:
-            doc = self.nlp(text)
+            doc = context.doc
 
             # Extract name (first PERSON entity)
             for ent in doc.ents:
@@ -146,8 +287,7 @@ class NLPAnalyzer:
                     info["location"] = ent.text
 
             # Extract experience (looking for patterns like "X years")
-            experience_pattern = r'\b(\d+)\s*(?:years?|yrs?)\b'
-            experience_match = re.search(experience_pattern, text)
+            experience_match = EXPERIENCE_PATTERN.search(text)
             if experience_match:
                 info["experience"] = f"{experience_match.group(1)} years"
 
@@ -185,4 +325,23 @@ class NLPAnalyzer:
         keywords = [word for word in words if word not in stop_words and len(word) > 2]
         
         # Return unique keywords
-        return list(set(keywords))[:10]
\ No newline at end of file
+        return list(set(keywords))[:10]
+
+
+# Per-process analyzer used when the executor runs stages in a process pool
+_worker_analyzer: Optional[NLPAnalyzer] = None
+
+
+def _get_worker_analyzer() -> NLPAnalyzer:
+    global _worker_analyzer
+    if _worker_analyzer is None:
+        _worker_analyzer = NLPAnalyzer()
+    return _worker_analyzer
+
+
+def _analyze_in_worker(text: str) -> Dict:
+    return _get_worker_analyzer().analyze_sync(text)
+
+
+def _analyze_batch_in_worker(texts: List[str], batch_size: Optional[int]) -> List[Dict]:
+    return _get_worker_analyzer().analyze_batch_sync(texts, batch_size)
@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Optional
+from config import APP_CONFIG, CALL_PROMPTS, INTERVIEW_QUESTIONS, PROMPT_CONFIG
+
+
+def interview_prompts() -> Dict[str, str]:
+    """Every fixed prompt of the call flow, by prompt id"""
+    prompts = {"welcome": CALL_PROMPTS['welcome']}
+    for question in INTERVIEW_QUESTIONS:
+        prompts[question['id']] = question['text']
+    prompts["goodbye"] = CALL_PROMPTS['goodbye']
+    return prompts
+
+
+class PromptBundle:
+    """Interview prompts pre-rendered to audio files and served statically
+
+    ``manifest.json`` maps each prompt id to the text it was rendered from,
+    the TTS cache key of the request (text, voice and audio config) and its
+    file. A changed question or voice never plays stale audio: ``url_for`` only
+    returns a URL when the rendered text, and the key when given, still match.
+    """
+
+    MANIFEST = "manifest.json"
+
+    def __init__(self, directory: Optional[str] = None, url_path: Optional[str] = None):
+        self.directory = directory or PROMPT_CONFIG['bundle_dir']
+        self.url_path = (url_path or PROMPT_CONFIG['url_path']).rstrip("/")
+        self.manifest: Dict[str, Dict[str, str]] = {}
+        # Hash of the manifest contents; changes whenever load or build changes it
+        self.version = ""
+        self.load()
+
+    def _set_manifest(self, manifest: Dict[str, Dict[str, str]]) -> None:
+        self.manifest = manifest
+        self.version = hashlib.sha256(json.dumps(manifest, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def load(self) -> None:
+        path = os.path.join(self.directory, self.MANIFEST)
+        try:
+            with open(path) as f:
+                self._set_manifest(json.load(f))
+        except (FileNotFoundError, ValueError):
+            self._set_manifest({})
+
+    def url_for(self, prompt_id: str, text: str, key: Optional[str] = None) -> Optional[str]:
+        """Absolute URL of the rendered prompt, or None to fall back to <Say>
+
+        ``key`` is the current TTS cache key for ``text``; when given, audio
+        rendered with another voice or audio config is treated as stale.
+        """
+        entry = self.manifest.get(prompt_id)
+        if not entry or entry.get("text") != text:
+            return None
+        if key is not None and entry.get("key") != key:
+            return None
+        return f"{APP_CONFIG['base_url']}{self.url_path}/{entry['file']}"
+
+    async def build(self, tts, prompts: Optional[Dict[str, str]] = None) -> Dict[str, Dict[str, str]]:
+        """Render every prompt with ``tts`` and write the files and manifest
+
+        Prompts whose file is already rendered for the current text and voice
+        are skipped, so rebuilding after a deploy only synthesizes what changed.
+        """
+        if not getattr(tts, "client", None):
+            raise RuntimeError("Text-to-speech client is not available; cannot render prompts")
+
+        os.makedirs(self.directory, exist_ok=True)
+        prompts = prompts or interview_prompts()
+        manifest = {}
+        for prompt_id, text in prompts.items():
+            key = tts.cache_key('text', text)
+            file_name = f"{prompt_id}-{key[:16]}.mp3"
+            path = os.path.join(self.directory, file_name)
+            previous = self.manifest.get(prompt_id) or {}
+            if previous.get("key") != key or previous.get("file") != file_name or not os.path.exists(path):
+                try:
+                    audio = await tts.synthesize(text)
+                except Exception as e:
+                    raise RuntimeError(f"Could not synthesize prompt '{prompt_id}': {e or 'request timed out'}")
+                temp_path = f"{path}.tmp"
+                with open(temp_path, "wb") as f:
+                    f.write(audio)
+                os.replace(temp_path, path)
+            manifest[prompt_id] = {"text": text, "key": key, "file": file_name}
+
+        temp_manifest = os.path.join(self.directory, f"{self.MANIFEST}.tmp")
+        with open(temp_manifest, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(temp_manifest, os.path.join(self.directory, self.MANIFEST))
+        self._set_manifest(manifest)
+        return manifest
+
+
+_shared_bundle: Optional[PromptBundle] = None
+_shared_lock = threading.Lock()
+
+
+def get_prompt_bundle() -> PromptBundle:
+    """Process-wide bundle built from PROMPT_CONFIG, shared by the call flow and the build step"""
+    global _shared_bundle
+    if _shared_bundle is None:
+        with _shared_lock:
+            if _shared_bundle is None:
+                _shared_bundle = PromptBundle()
+    return _shared_bundle
+
+
+if __name__ == "__main__":
+    # Build step: python prompt_bundle.py
+    import asyncio
+    from text_to_speech import TextToSpeech
+
+    bundle = PromptBundle()
+    rendered = asyncio.run(bundle.build(TextToSpeech()))
+    print(f"Rendered {len(rendered)} prompts into {bundle.directory}")
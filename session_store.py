@@ -0,0 +1,221 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from config import APP_CONFIG, SESSION_CONFIG
+
+
+class CallSession:
+    """Server-side state of one interview call, keyed by Twilio's CallSid"""
+
+    def __init__(self,
+                 call_sid: str,
+                 question_index: int = 0,
+                 transcripts: Optional[Dict[int, str]] = None,
+                 analyses: Optional[Dict[int, Dict]] = None,
+                 timings: Optional[Dict[str, float]] = None,
+                 status: str = "in-progress",
+                 result: Optional[Dict] = None,
+                 started_at: Optional[float] = None,
+                 updated_at: Optional[float] = None,
+                 question_asked_at: Optional[float] = None,
+                 stream_transcripts: Optional[Dict[int, str]] = None):
+        now = time.time()
+        self.call_sid = call_sid
+        # Index of the question the caller is currently answering
+        self.question_index = question_index
+        self.transcripts = transcripts or {}
+        self.analyses = analyses or {}
+        self.timings = timings or {}
+        self.status = status
+        self.result = result
+        self.started_at = started_at or now
+        self.updated_at = updated_at or now
+        # When the current question's TwiML was served; answer times are measured from it
+        self.question_asked_at = question_asked_at or now
+        # Final transcripts of the live media stream, by utterance
+        self.stream_transcripts = stream_transcripts or {}
+
+    def to_dict(self) -> Dict:
+        return {
+            "call_sid": self.call_sid,
+            "question_index": self.question_index,
+            "transcripts": self.transcripts,
+            "analyses": self.analyses,
+            "timings": self.timings,
+            "status": self.status,
+            "result": self.result,
+            "started_at": self.started_at,
+            "updated_at": self.updated_at,
+            "question_asked_at": self.question_asked_at,
+            "stream_transcripts": self.stream_transcripts
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CallSession":
+        data = dict(data)
+        # JSON object keys are strings; answers are indexed by question number
+        data["transcripts"] = {int(k): v for k, v in (data.get("transcripts") or {}).items()}
+        data["analyses"] = {int(k): v for k, v in (data.get("analyses") or {}).items()}
+        data["stream_transcripts"] = {int(k): v for k, v in (data.get("stream_transcripts") or {}).items()}
+        return cls(**data)
+
+
+class MemorySessionStore:
+    """In-process session store with TTL and size-capped eviction
+
+    Sessions are kept in least-recently-updated order, so lookups are O(1) and
+    expired sessions are always at the front and evicted in O(1) each.
+    """
+
+    def __init__(self, ttl: float = 3600.0, max_sessions: int = 100000):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, CallSession]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    def _evict(self, now: float) -> None:
+        while self._sessions:
+            call_sid, session = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and now - session.updated_at < self.ttl:
+                break
+            del self._sessions[call_sid]
+            self.evicted += 1
+
+    def get(self, call_sid: str) -> Optional[CallSession]:
+        with self._lock:
+            self._evict(time.time())
+            return self._sessions.get(call_sid)
+
+    def put(self, session: CallSession) -> None:
+        now = time.time()
+        session.updated_at = now
+        with self._lock:
+            self._sessions[session.call_sid] = session
+            self._sessions.move_to_end(session.call_sid)
+            self._evict(now)
+
+    def get_or_create(self, call_sid: str) -> CallSession:
+        session = self.get(call_sid)
+        if session is None:
+            session = CallSession(call_sid)
+            self.put(session)
+        return session
+
+    def delete(self, call_sid: str) -> None:
+        with self._lock:
+            self._sessions.pop(call_sid, None)
+
+    def evict_expired(self) -> int:
+        before = self.evicted
+        with self._lock:
+            self._evict(time.time())
+        return self.evicted - before
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+class SQLiteSessionStore:
+    """Session store in a local SQLite file, shared by every worker on the host
+
+    Sessions are stored as JSON under their CallSid primary key. Expired rows
+    are ignored on read and deleted by ``evict_expired``.
+    """
+
+    def __init__(self, path: str = "sessions.db", ttl: float = 3600.0):
+        self.path = path
+        self.ttl = ttl
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS call_sessions (
+                    call_sid TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS call_sessions_updated ON call_sessions (updated_at)"
+            )
+
+    def get(self, call_sid: str) -> Optional[CallSession]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM call_sessions WHERE call_sid = ? AND updated_at > ?",
+                (call_sid, time.time() - self.ttl)
+            ).fetchone()
+        return CallSession.from_dict(json.loads(row[0])) if row else None
+
+    def put(self, session: CallSession) -> None:
+        session.updated_at = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO call_sessions (call_sid, data, updated_at) VALUES (?, ?, ?)",
+                (session.call_sid, json.dumps(session.to_dict()), session.updated_at)
+            )
+
+    def get_or_create(self, call_sid: str) -> CallSession:
+        session = self.get(call_sid)
+        if session is None:
+            session = CallSession(call_sid)
+            self.put(session)
+        return session
+
+    def delete(self, call_sid: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM call_sessions WHERE call_sid = ?", (call_sid,))
+
+    def evict_expired(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM call_sessions WHERE updated_at <= ?", (time.time() - self.ttl,)
+            )
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM call_sessions").fetchone()[0]
+
+
+def validate_session_backend() -> None:
+    """Raise ValueError if the configured backend cannot serve every worker
+
+    Twilio sends each webhook of a call to whichever worker is free, so
+    in-process sessions only work with a single worker.
+    """
+    if SESSION_CONFIG['backend'] == "memory" and APP_CONFIG['workers'] > 1:
+        raise ValueError(
+            f"SESSION_BACKEND=memory cannot be shared by {APP_CONFIG['workers']} workers "
+            f"(WEB_CONCURRENCY); use SESSION_BACKEND=sqlite"
+        )
+
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+
+def get_session_store():
+    """Process-wide session store built from SESSION_CONFIG"""
+    global _shared_store
+    if _shared_store is None:
+        with _shared_lock:
+            if _shared_store is None:
+                if SESSION_CONFIG['backend'] == "sqlite":
+                    _shared_store = SQLiteSessionStore(SESSION_CONFIG['db_path'], ttl=SESSION_CONFIG['ttl'])
+                elif SESSION_CONFIG['backend'] == "memory":
+                    validate_session_backend()
+                    _shared_store = MemorySessionStore(
+                        ttl=SESSION_CONFIG['ttl'],
+                        max_sessions=SESSION_CONFIG['max_sessions']
+                    )
+                else:
+                    raise ValueError(f"Unknown session backend: {SESSION_CONFIG['backend']}")
+    return _shared_store
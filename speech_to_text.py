@@ -1,55 +1,256 @@
-import whisper
-import requests
-from typing import Dict, Optional
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional
+from audio import WHISPER_SAMPLE_RATE, decode_wav, pcm16_decode, resample
+from audio_downloader import AudioDownloader, get_audio_downloader
+from config import INTERVIEW_QUESTIONS, MODEL_CONFIG, STT_CONFIG
+from model_loader import registry
+from stt_backends import get_backend
+import numpy as np
 import tempfile
 import os
 
+
+def get_stt_backend(model_name: Optional[str] = None):
+    """Backend for a model under the configured engine"""
+    return get_backend(
+        STT_CONFIG['engine'],
+        model_name or MODEL_CONFIG['whisper_model'],
+        compute_type=STT_CONFIG['compute_type'],
+        cpu_threads=STT_CONFIG['cpu_threads']
+    )
+
+
+def model_for_question(question: Dict) -> str:
+    """STT model tier for an interview question (see INTERVIEW_QUESTIONS)"""
+    return question.get('stt_model') or MODEL_CONFIG['whisper_model']
+
+
+# Register the default and per-question models up front so they can be warmed
+# by name; only the default is warmed by default, the other tiers load on first use
+for _model_name in {MODEL_CONFIG['whisper_model']} | {model_for_question(q) for q in INTERVIEW_QUESTIONS}:
+    get_stt_backend(_model_name)
+registry.require(get_stt_backend().model_key)
+
+class TranscriptionScheduler:
+    """Collects utterances from concurrent calls into micro-batches for one model
+
+    Callers await ``transcribe``; a single worker drains the queue, waiting at
+    most ``max_wait_ms`` after the first pending item to fill a batch of up to
+    ``max_batch_size``, runs the batch on the model thread and resolves each
+    caller's future with its own result.
+    """
+
+    def __init__(self,
+                 backend,
+                 max_batch_size: int = 8,
+                 max_wait_ms: float = 50.0):
+        self.backend = backend
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        # One thread owns the model so batches never run concurrently on it
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="whisper")
+        self._queue: Optional[asyncio.Queue] = None
+        self._queue_loop = None
+        self._worker: Optional[asyncio.Task] = None
+
+        self._started_at = time.monotonic()
+        self._batches = 0
+        self._items = 0
+        self._audio_seconds = 0.0
+        self._busy_seconds = 0.0
+        self._batch_sizes: Deque[int] = deque(maxlen=1000)
+        self._queue_waits: Deque[float] = deque(maxlen=1000)
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        loop = asyncio.get_event_loop()
+        if self._queue is None or self._queue_loop is not loop:
+            self._queue = asyncio.Queue()
+            self._queue_loop = loop
+            self._worker = None
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._run())
+        return self._queue
+
+    async def transcribe(self, audio: np.ndarray) -> Dict[str, str]:
+        """Queue 16 kHz samples and wait for their transcript"""
+        queue = self._ensure_worker()
+        future = asyncio.get_event_loop().create_future()
+        await queue.put((audio, future, time.monotonic()))
+        return await future
+
+    async def run_exclusive(self, func: Callable, *args: Any) -> Any:
+        """Run other work that needs the model on the model thread"""
+        return await asyncio.get_event_loop().run_in_executor(self.executor, func, *args)
+
+    async def _run(self) -> None:
+        queue = self._queue
+        loop = asyncio.get_event_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            started = time.monotonic()
+            for _, _, enqueued_at in batch:
+                self._queue_waits.append(started - enqueued_at)
+
+            audios = [audio for audio, _, _ in batch]
+            try:
+                results = await loop.run_in_executor(self.executor, self.backend.transcribe_batch, audios)
+            except Exception as e:
+                results = [{"text": "", "error": str(e)} for _ in batch]
+
+            self._busy_seconds += time.monotonic() - started
+            self._batches += 1
+            self._items += len(batch)
+            self._audio_seconds += sum(len(audio) for audio in audios) / WHISPER_SAMPLE_RATE
+            self._batch_sizes.append(len(batch))
+
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def metrics(self) -> Dict:
+        """Queue wait, batch size and throughput since start"""
+        waits = sorted(self._queue_waits)
+        elapsed = time.monotonic() - self._started_at
+        pending = self._queue.qsize() if self._queue is not None else 0
+        return {
+            "pending": pending,
+            "batches": self._batches,
+            "utterances": self._items,
+            "avg_batch_size": round(self._items / self._batches, 2) if self._batches else 0.0,
+            "max_batch_size": max(self._batch_sizes) if self._batch_sizes else 0,
+            "queue_wait_ms_p50": round(waits[len(waits) // 2] * 1000, 1) if waits else 0.0,
+            "queue_wait_ms_p95": round(waits[int(len(waits) * 0.95)] * 1000, 1) if waits else 0.0,
+            "utterances_per_second": round(self._items / elapsed, 2) if elapsed else 0.0,
+            # Seconds of audio transcribed per second the model was busy
+            "audio_seconds_per_busy_second": round(self._audio_seconds / self._busy_seconds, 2)
+            if self._busy_seconds else 0.0
+        }
+
+
+_schedulers: Dict[str, TranscriptionScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(backend, max_batch_size: int = 8, max_wait_ms: float = 50.0) -> TranscriptionScheduler:
+    """Process-wide scheduler for a backend's model
+
+    Every SpeechToText instance shares it, so each model has exactly one
+    batching thread and utterances from all callers merge into its batches.
+    The batch settings of the first caller apply.
+    """
+    scheduler = _schedulers.get(backend.model_key)
+    if scheduler is None:
+        with _schedulers_lock:
+            scheduler = _schedulers.get(backend.model_key)
+            if scheduler is None:
+                scheduler = TranscriptionScheduler(backend, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+                _schedulers[backend.model_key] = scheduler
+    return scheduler
+
+
 class SpeechToText:
-    def __init__(self, model_name: str = "base"):
-        """Initialize Whisper model for speech recognition"""
-        try:
-            self.model = whisper.load_model(model_name)
-        except Exception as e:
-            print(f"Warning: Could not load Whisper model: {e}")
-            self.model = None
+    def __init__(self,
+                 model_name: Optional[str] = None,
+                 downloader: Optional[AudioDownloader] = None,
+                 batch_max_size: Optional[int] = None,
+                 batch_max_wait_ms: Optional[float] = None):
+        """Set up speech recognition; models load on first use"""
+        self.model_name = model_name or MODEL_CONFIG['whisper_model']
+        self.backend = get_stt_backend(self.model_name)
+        # Shared pooled HTTP client for recording downloads
+        self.downloader = downloader or get_audio_downloader()
+        self.batch_max_size = batch_max_size or STT_CONFIG['batch_max_size']
+        self.batch_max_wait_ms = batch_max_wait_ms or STT_CONFIG['batch_max_wait_ms']
+        # Shared batching scheduler of each model tier this instance has used
+        self._schedulers: Dict[str, TranscriptionScheduler] = {}
 
-    async def transcribe(self, audio_url: str) -> Dict[str, str]:
-        """Transcribe audio from URL to text"""
+    @property
+    def model(self):
+        """Default model, loaded on first use"""
+        return self.backend.model
+
+    @property
+    def scheduler(self) -> TranscriptionScheduler:
+        return self.scheduler_for(self.model_name)
+
+    def scheduler_for(self, model_name: Optional[str] = None) -> TranscriptionScheduler:
+        """Utterances for the same model are batched through one process-wide scheduler"""
+        model_name = model_name or self.model_name
+        if model_name not in self._schedulers:
+            self._schedulers[model_name] = get_scheduler(
+                get_stt_backend(model_name),
+                max_batch_size=self.batch_max_size,
+                max_wait_ms=self.batch_max_wait_ms
+            )
+        return self._schedulers[model_name]
+
+    async def transcribe(self, audio_url: str, model_name: Optional[str] = None) -> Dict[str, str]:
+        """Transcribe audio from URL to text, optionally with a specific model tier"""
         try:
             # Download audio file
             audio_data = await self._download_audio(audio_url)
             if not audio_data:
                 return {"text": "", "error": "Failed to download audio"}
 
-            # Save to temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-                temp_file.write(audio_data)
-                temp_path = temp_file.name
+            return await self._transcribe_bytes(audio_data, model_name)
 
-            try:
-                # Transcribe using Whisper
-                result = self.model.transcribe(temp_path)
-                transcribed_text = result["text"]
-
-                return {
-                    "text": transcribed_text,
-                    "language": result.get("language", "en")
-                }
+        except Exception as e:
+            return {"text": "", "error": str(e)}
 
-            finally:
-                # Clean up temporary file
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
+    def transcribe_array(self, audio: np.ndarray) -> Dict[str, str]:
+        """Transcribe mono float32 samples at 16 kHz"""
+        return self.backend.transcribe(audio)
 
+    async def transcribe_audio(self, audio: np.ndarray, model_name: Optional[str] = None) -> Dict[str, str]:
+        """Transcribe 16 kHz samples through the batching scheduler"""
+        try:
+            return await self.scheduler_for(model_name).transcribe(audio)
         except Exception as e:
             return {"text": "", "error": str(e)}
 
+    def metrics(self) -> Dict:
+        """Batching scheduler metrics per model tier"""
+        return {name: scheduler.metrics() for name, scheduler in self._schedulers.items()}
+
+    async def _transcribe_bytes(self, audio_data: bytes, model_name: Optional[str] = None) -> Dict[str, str]:
+        """Decode WAV in memory; only other formats go through a temp file and ffmpeg"""
+        scheduler = self.scheduler_for(model_name)
+        audio = decode_wav(audio_data)
+        if audio is not None:
+            return await scheduler.transcribe(audio)
+        return await scheduler.run_exclusive(self._transcribe_file, scheduler.backend, audio_data)
+
+    def _transcribe_file(self, backend, audio_data: bytes) -> Dict[str, str]:
+        # Save to temporary file so the backend can decode it with ffmpeg
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".audio") as temp_file:
+            temp_file.write(audio_data)
+            temp_path = temp_file.name
+
+        try:
+            return backend.transcribe(temp_path)
+        finally:
+            # Clean up temporary file
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
     async def _download_audio(self, url: str) -> Optional[bytes]:
         """Download audio file from URL"""
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            return response.content
+            return await self.downloader.download(url)
         except Exception as e:
             print(f"Error downloading audio: {e}")
             return None
@@ -61,22 +262,19 @@ class SpeechToText:
             "language": "en"
         }
 
-    async def transcribe_stream(self, audio_stream: bytes) -> Dict[str, str]:
-        """Transcribe audio from a byte stream"""
-        try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-                temp_file.write(audio_stream)
-                temp_path = temp_file.name
+    async def transcribe_stream(self,
+                                audio_stream: bytes,
+                                sample_rate: Optional[int] = None,
+                                model_name: Optional[str] = None) -> Dict[str, str]:
+        """Transcribe audio from a byte stream
 
-            try:
-                result = self.model.transcribe(temp_path)
-                return {
-                    "text": result["text"],
-                    "language": result.get("language", "en")
-                }
-            finally:
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
+        ``audio_stream`` is a complete audio file, or raw 16-bit mono PCM when
+        ``sample_rate`` is given.
+        """
+        try:
+            if sample_rate is not None:
+                return await self.scheduler_for(model_name).transcribe(resample(pcm16_decode(audio_stream), sample_rate))
+            return await self._transcribe_bytes(audio_stream, model_name)
 
         except Exception as e:
-            return {"text": "", "error": str(e)}
\ No newline at end of file
+            return {"text": "", "error": str(e)}
@@ -0,0 +1,195 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+import numpy as np
+from audio import mulaw_decode, resample
+from config import STREAMING_CONFIG
+
+TWILIO_SAMPLE_RATE = 8000
+
+
+class VoiceActivityDetector:
+    """Per-frame speech detection for 8 kHz audio
+
+    Uses webrtcvad when it is installed, otherwise an energy gate that tracks
+    the background noise floor.
+    """
+
+    def __init__(self,
+                 sample_rate: int = TWILIO_SAMPLE_RATE,
+                 aggressiveness: int = 2,
+                 energy_threshold_db: float = -45.0,
+                 noise_margin_db: float = 10.0):
+        self.sample_rate = sample_rate
+        self.energy_threshold_db = energy_threshold_db
+        self.noise_margin_db = noise_margin_db
+        self.noise_floor_db = energy_threshold_db - noise_margin_db
+        try:
+            import webrtcvad
+            self._vad = webrtcvad.Vad(aggressiveness)
+        except ImportError:
+            self._vad = None
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        """Whether a 10, 20 or 30 ms frame of float32 samples contains speech"""
+        if self._vad is not None:
+            pcm = (np.clip(frame, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+            return self._vad.is_speech(pcm, self.sample_rate)
+
+        rms = float(np.sqrt(np.mean(frame ** 2))) if len(frame) else 0.0
+        level_db = 20 * np.log10(max(rms, 1e-10))
+        speech = level_db > max(self.energy_threshold_db, self.noise_floor_db + self.noise_margin_db)
+        if not speech:
+            # Slowly follow the background level so line noise is not speech
+            self.noise_floor_db = 0.95 * self.noise_floor_db + 0.05 * level_db
+        return speech
+
+
+class StreamingTranscriber:
+    """Incremental transcription of one caller's 8 kHz mu-law audio stream
+
+    Frames are gated by voice activity. While the caller speaks, the most
+    recent ``window_seconds`` of the utterance are re-transcribed every
+    ``partial_interval_ms`` and emitted as partial transcripts; after
+    ``end_silence_ms`` of silence the whole utterance is transcribed once more
+    and emitted as final. Transcription runs in background tasks, so ``feed``
+    never waits on the model; finals are still emitted in utterance order.
+    """
+
+    def __init__(self,
+                 transcribe: Callable[[np.ndarray], Awaitable[Dict]],
+                 emit: Callable[[Dict], Awaitable[None]],
+                 vad: Optional[VoiceActivityDetector] = None,
+                 frame_ms: int = 20,
+                 end_silence_ms: Optional[int] = None,
+                 partial_interval_ms: Optional[int] = None,
+                 window_seconds: Optional[float] = None,
+                 max_utterance_seconds: Optional[float] = None,
+                 min_speech_ms: Optional[int] = None,
+                 pre_roll_ms: Optional[int] = None):
+        self._transcribe = transcribe
+        self._emit = emit
+        self.vad = vad or VoiceActivityDetector(
+            aggressiveness=STREAMING_CONFIG['vad_aggressiveness'],
+            energy_threshold_db=STREAMING_CONFIG['energy_threshold_db']
+        )
+        self.frame_samples = TWILIO_SAMPLE_RATE * frame_ms // 1000
+        self.frame_ms = frame_ms
+        self.end_silence_ms = end_silence_ms or STREAMING_CONFIG['end_silence_ms']
+        self.partial_interval_ms = partial_interval_ms or STREAMING_CONFIG['partial_interval_ms']
+        self.window_samples = int((window_seconds or STREAMING_CONFIG['window_seconds']) * TWILIO_SAMPLE_RATE)
+        self.max_utterance_samples = int(
+            (max_utterance_seconds or STREAMING_CONFIG['max_utterance_seconds']) * TWILIO_SAMPLE_RATE
+        )
+        self.min_speech_ms = min_speech_ms if min_speech_ms is not None else STREAMING_CONFIG['min_speech_ms']
+        self.pre_roll_frames = (pre_roll_ms if pre_roll_ms is not None else STREAMING_CONFIG['pre_roll_ms']) // frame_ms
+
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._pre_roll: List[np.ndarray] = []
+        self._utterance: List[np.ndarray] = []
+        self._utterance_samples = 0
+        self._in_speech = False
+        self._speech_ms = 0
+        self._silence_ms = 0
+        self._since_partial_ms = 0
+        self._partial_task: Optional[asyncio.Task] = None
+        self._final_tasks: Set[asyncio.Task] = set()
+        self._last_final: Optional[asyncio.Task] = None
+        self.utterance_index = 0
+
+    async def feed(self, payload: bytes) -> None:
+        """Consume a chunk of mu-law audio (any length)"""
+        self._pending = np.concatenate([self._pending, mulaw_decode(payload)])
+        while len(self._pending) >= self.frame_samples:
+            frame = self._pending[:self.frame_samples]
+            self._pending = self._pending[self.frame_samples:]
+            await self._process_frame(frame)
+
+    async def _process_frame(self, frame: np.ndarray) -> None:
+        speech = self.vad.is_speech(frame)
+
+        if not self._in_speech:
+            if speech:
+                self._in_speech = True
+                self._utterance = self._pre_roll + [frame]
+                self._utterance_samples = sum(len(f) for f in self._utterance)
+                self._speech_ms = self.frame_ms
+                self._silence_ms = 0
+                self._since_partial_ms = 0
+                self._pre_roll = []
+            else:
+                self._pre_roll = (self._pre_roll + [frame])[-self.pre_roll_frames:] if self.pre_roll_frames else []
+            return
+
+        self._utterance.append(frame)
+        self._utterance_samples += len(frame)
+        self._since_partial_ms += self.frame_ms
+        if speech:
+            self._speech_ms += self.frame_ms
+            self._silence_ms = 0
+        else:
+            self._silence_ms += self.frame_ms
+
+        if self._silence_ms >= self.end_silence_ms or self._utterance_samples >= self.max_utterance_samples:
+            self._finish_utterance()
+        elif speech and self._since_partial_ms >= self.partial_interval_ms:
+            self._since_partial_ms = 0
+            self._start_partial()
+
+    def _start_partial(self) -> None:
+        # Skip this window if the previous partial is still being decoded
+        if self._partial_task is not None and not self._partial_task.done():
+            return
+        window = np.concatenate(self._utterance)[-self.window_samples:]
+        self._partial_task = asyncio.ensure_future(self._run(window, "partial", self.utterance_index))
+
+    def _finish_utterance(self) -> None:
+        audio = np.concatenate(self._utterance) if self._utterance else np.zeros(0, dtype=np.float32)
+        speech_ms = self._speech_ms
+        self._utterance = []
+        self._utterance_samples = 0
+        self._in_speech = False
+        self._speech_ms = 0
+        self._silence_ms = 0
+
+        if self._partial_task is not None and not self._partial_task.done():
+            self._partial_task.cancel()
+        self._partial_task = None
+
+        # Ignore clicks and short bursts of noise
+        if speech_ms < self.min_speech_ms:
+            return
+        index = self.utterance_index
+        self.utterance_index += 1
+        task = asyncio.ensure_future(self._run(audio, "final", index, after=self._last_final))
+        self._last_final = task
+        self._final_tasks.add(task)
+        task.add_done_callback(self._final_done)
+
+    def _final_done(self, task: asyncio.Task) -> None:
+        self._final_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Warning: Could not transcribe utterance: {task.exception()}")
+
+    async def _run(self, audio: np.ndarray, kind: str, index: int, after: Optional[asyncio.Task] = None) -> None:
+        start = time.perf_counter()
+        result = await self._transcribe(resample(audio, TWILIO_SAMPLE_RATE))
+        latency_ms = round((time.perf_counter() - start) * 1000, 1)
+        if after is not None:
+            # A later utterance may decode first; emit finals in order
+            await asyncio.gather(after, return_exceptions=True)
+        await self._emit({
+            "event": "transcript",
+            "type": kind,
+            "utterance": index,
+            "text": result.get("text", "").strip(),
+            "audio_seconds": round(len(audio) / TWILIO_SAMPLE_RATE, 3),
+            "latency_ms": latency_ms
+        })
+
+    async def close(self) -> None:
+        """End of stream: finalize any utterance still in progress and wait for every final"""
+        if self._in_speech:
+            self._finish_utterance()
+        if self._final_tasks:
+            await asyncio.gather(*self._final_tasks, return_exceptions=True)
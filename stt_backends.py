@@ -0,0 +1,109 @@
+import threading
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from model_loader import registry
+
+STT_ENGINES = ("whisper", "faster-whisper")
+
+
+class WhisperBackend:
+    """Stock openai-whisper (PyTorch); batches short utterances in one decode"""
+
+    engine = "whisper"
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self.model_key = f"whisper-{model_name}"
+
+        def _load():
+            import whisper
+            return whisper.load_model(model_name)
+
+        registry.register(self.model_key, _load)
+
+    @property
+    def model(self):
+        return registry.get(self.model_key)
+
+    def transcribe(self, audio) -> Dict[str, str]:
+        """Transcribe 16 kHz float32 samples or an audio file path"""
+        result = self.model.transcribe(audio)
+        return {
+            "text": result["text"],
+            "language": result.get("language", "en")
+        }
+
+    def transcribe_batch(self, audios: List[np.ndarray]) -> List[Dict[str, str]]:
+        """Decode utterances of up to 30 s together; longer ones one at a time"""
+        import whisper
+        import torch
+
+        model = self.model
+        results: List[Optional[Dict[str, str]]] = [None] * len(audios)
+        short = [i for i, audio in enumerate(audios) if len(audio) <= whisper.audio.N_SAMPLES]
+
+        if short:
+            mels = torch.stack([
+                whisper.log_mel_spectrogram(whisper.pad_or_trim(torch.from_numpy(audios[i])), model.dims.n_mels)
+                for i in short
+            ]).to(model.device)
+            options = whisper.DecodingOptions(fp16=model.device.type == "cuda", without_timestamps=True)
+            for i, decoded in zip(short, whisper.decode(model, mels, options)):
+                results[i] = {"text": decoded.text, "language": decoded.language or "en"}
+
+        for i, result in enumerate(results):
+            if result is None:
+                results[i] = self.transcribe(audios[i])
+        return results
+
+
+class FasterWhisperBackend:
+    """CTranslate2 Whisper (faster-whisper) with quantized CPU inference"""
+
+    engine = "faster-whisper"
+
+    def __init__(self, model_name: str, compute_type: str = "int8", cpu_threads: int = 0):
+        self.model_name = model_name
+        self.compute_type = compute_type
+        self.model_key = f"faster-whisper-{model_name}-{compute_type}"
+
+        def _load():
+            from faster_whisper import WhisperModel
+            return WhisperModel(model_name, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads)
+
+        registry.register(self.model_key, _load)
+
+    @property
+    def model(self):
+        return registry.get(self.model_key)
+
+    def transcribe(self, audio) -> Dict[str, str]:
+        """Transcribe 16 kHz float32 samples or an audio file path"""
+        segments, info = self.model.transcribe(audio)
+        # Segments are generated lazily; joining them runs the decode
+        return {
+            "text": "".join(segment.text for segment in segments),
+            "language": info.language or "en"
+        }
+
+    def transcribe_batch(self, audios: List[np.ndarray]) -> List[Dict[str, str]]:
+        # CTranslate2 already spreads one decode over the CPU threads
+        return [self.transcribe(audio) for audio in audios]
+
+
+_backends: Dict[Tuple[str, str, str], object] = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(engine: str, model_name: str, compute_type: str = "int8", cpu_threads: int = 0):
+    """Shared backend for an engine/model pair (models load on first use)"""
+    if engine not in STT_ENGINES:
+        raise ValueError(f"Unknown STT engine: {engine}")
+    key = (engine, model_name, compute_type if engine == "faster-whisper" else "")
+    with _backends_lock:
+        if key not in _backends:
+            if engine == "whisper":
+                _backends[key] = WhisperBackend(model_name)
+            else:
+                _backends[key] = FasterWhisperBackend(model_name, compute_type, cpu_threads)
+        return _backends[key]
@@ -1,69 +1,228 @@
 from google.cloud import texttospeech
-from typing import Optional
+from typing import AsyncIterator, Dict, List, Optional
+from config import TTS_CONFIG
+from executor import BoundedExecutor, SingleFlight
+from tts_cache import TTSCache, cache_key
+from voice_catalog import VoiceCatalog
+import asyncio
 import os
+import re
+import threading
 from dotenv import load_dotenv
 
 load_dotenv()
 
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?;:])\s+')
+
+
+def split_sentences(text: str, max_chars: int = 200) -> List[str]:
+    """Split text into sentences, packing short ones up to ``max_chars``
+
+    A single sentence longer than ``max_chars`` is further split on word
+    boundaries, so every piece is small enough to synthesize quickly. The
+    first sentence is never packed, so the first audio is ready sooner.
+    """
+    pieces: List[str] = []
+    for sentence in SENTENCE_BOUNDARY.split(text.strip()):
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            pieces.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if sentence:
+            pieces.append(sentence)
+
+    packed: List[str] = []
+    for piece in pieces:
+        if len(packed) > 1 and len(packed[-1]) + 1 + len(piece) <= max_chars:
+            packed[-1] = f"{packed[-1]} {piece}"
+        else:
+            packed.append(piece)
+    return packed
+
+
+_tts_executor: Optional[BoundedExecutor] = None
+_tts_executor_lock = threading.Lock()
+
+
+def get_tts_executor() -> BoundedExecutor:
+    """Process-wide pool for blocking synthesis calls, sized by TTS_CONFIG['max_in_flight']"""
+    global _tts_executor
+    if _tts_executor is None:
+        with _tts_executor_lock:
+            if _tts_executor is None:
+                _tts_executor = BoundedExecutor(
+                    kind="thread",
+                    max_workers=TTS_CONFIG['max_in_flight'],
+                    max_queue=TTS_CONFIG['max_in_flight'],
+                    queue_timeout=TTS_CONFIG['queue_timeout']
+                )
+    return _tts_executor
+
+
 class TextToSpeech:
-    def __init__(self):
+    def __init__(self,
+                 client=None,
+                 cache: Optional[TTSCache] = None,
+                 executor: Optional[BoundedExecutor] = None,
+                 request_timeout: Optional[float] = None,
+                 voice_catalog: Optional[VoiceCatalog] = None):
         """Initialize Google Cloud Text-to-Speech client"""
-        try:
-            self.client = texttospeech.TextToSpeechClient()
-            self.voice = texttospeech.VoiceSelectionParams(
-                language_code="en-US",
-                name="en-US-Standard-I",
-                ssml_gender=texttospeech.SsmlVoiceGender.FEMALE
-            )
-            self.audio_config = texttospeech.AudioConfig(
-                audio_encoding=texttospeech.AudioEncoding.MP3,
-                speaking_rate=0.9,  # Slightly slower for clarity
-                pitch=0.0
+        # Available voices, fetched once and refreshed in the background
+        self.voice_catalog = voice_catalog or VoiceCatalog(
+            self._list_voices,
+            ttl=TTS_CONFIG['voice_catalog_ttl'],
+            retry_after=TTS_CONFIG['voice_catalog_retry']
+        )
+        # Blocking client calls run in a bounded pool; identical concurrent
+        # requests share one upstream call
+        self.executor = executor or get_tts_executor()
+        self.request_timeout = request_timeout or TTS_CONFIG['request_timeout']
+        self._in_flight = SingleFlight()
+        # Synthesized prompts are cached by content hash of input, voice and audio config
+        if cache is None and TTS_CONFIG['cache_enabled']:
+            cache = TTSCache(
+                cache_dir=TTS_CONFIG['cache_dir'],
+                max_entries=TTS_CONFIG['cache_max_entries'],
+                max_bytes=TTS_CONFIG['cache_max_bytes']
             )
+        self.cache = cache
+        self.customize_voice()
+        try:
+            self.client = client or texttospeech.TextToSpeechClient()
         except Exception as e:
             print(f"Warning: Could not initialize TTS client: {e}")
             self.client = None
 
-    async def synthesize(self, text: str) -> Optional[bytes]:
-        """Convert text to speech"""
+    async def synthesize(self, text: str, timeout: Optional[float] = None) -> bytes:
+        """Convert text to speech
+
+        Placeholder audio is returned only without a client (mock mode). A
+        saturated pool (ExecutorBusyError), a missed deadline
+        (asyncio.TimeoutError) or a client error is raised, so overload is
+        never passed off as audio.
+        """
         try:
-            if not self.client:
-                return self.mock_synthesize()
+            return await self._synthesize_async("text", text, timeout)
 
-            synthesis_input = texttospeech.SynthesisInput(text=text)
+        except asyncio.TimeoutError:
+            print("Error in text-to-speech synthesis: request timed out")
+            raise
+        except Exception as e:
+            print(f"Error in text-to-speech synthesis: {e}")
+            raise
 
-            response = self.client.synthesize_speech(
-                input=synthesis_input,
-                voice=self.voice,
-                audio_config=self.audio_config
-            )
+    async def synthesize_ssml(self, ssml: str, timeout: Optional[float] = None) -> bytes:
+        """Convert SSML to speech for more natural pronunciation
 
-            return response.audio_content
+        Errors are raised as in ``synthesize``.
+        """
+        try:
+            return await self._synthesize_async("ssml", ssml, timeout)
 
+        except asyncio.TimeoutError:
+            print("Error in SSML synthesis: request timed out")
+            raise
         except Exception as e:
-            print(f"Error in text-to-speech synthesis: {e}")
+            print(f"Error in SSML synthesis: {e}")
+            raise
+
+    async def _synthesize_async(self, kind: str, content: str, timeout: Optional[float] = None) -> bytes:
+        """Synthesize off the event loop within a deadline of ``timeout`` seconds"""
+        if not self.client:
             return self.mock_synthesize()
 
-    async def synthesize_ssml(self, ssml: str) -> Optional[bytes]:
-        """Convert SSML to speech for more natural pronunciation"""
+        key = self.cache_key(kind, content)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        deadline = timeout or self.request_timeout
+        # The shared call keeps running for the other waiters if this caller
+        # gives up; the client timeout bounds how long the worker thread is held
+        return await asyncio.wait_for(
+            self._in_flight.run(key, lambda: self.executor.run(self._synthesize, kind, content, deadline)),
+            timeout=deadline
+        )
+
+    async def synthesize_stream(self,
+                                text: str,
+                                chunk_size: Optional[int] = None,
+                                timeout: Optional[float] = None) -> AsyncIterator[bytes]:
+        """Yield MP3 audio for ``text`` in chunks as soon as each part is ready
+
+        Long prompts are split into sentences that are synthesized separately,
+        up to ``TTS_CONFIG['stream_lookahead']`` ahead of the one being sent, so
+        playback can start after the first sentence instead of the whole text.
+        MP3 frames are self-delimiting, so the concatenated parts play as one clip.
+        A sentence that fails or times out ends the stream with its error rather
+        than splicing placeholder audio into the clip.
+        """
+        chunk_size = chunk_size or TTS_CONFIG['stream_chunk_size']
+        sentences = split_sentences(text, TTS_CONFIG['stream_max_sentence_chars'])
+        lookahead = max(1, TTS_CONFIG['stream_lookahead'])
+        pending: List[asyncio.Future] = []
         try:
-            if not self.client:
-                return self.mock_synthesize()
+            for index in range(len(sentences)):
+                while len(pending) < lookahead and index + len(pending) < len(sentences):
+                    sentence = sentences[index + len(pending)]
+                    pending.append(asyncio.ensure_future(self._synthesize_async("text", sentence, timeout)))
 
-            synthesis_input = texttospeech.SynthesisInput(ssml=ssml)
+                try:
+                    audio = await pending.pop(0)
+                except asyncio.TimeoutError:
+                    print(f"Error in streaming synthesis: sentence {index + 1} of {len(sentences)} timed out")
+                    raise
+                except Exception as e:
+                    print(f"Error in streaming synthesis: sentence {index + 1} of {len(sentences)}: {e}")
+                    raise
+                for start in range(0, len(audio), chunk_size):
+                    yield audio[start:start + chunk_size]
+        finally:
+            # The client went away; do not wait for sentences nobody will hear
+            for future in pending:
+                future.cancel()
 
-            response = self.client.synthesize_speech(
-                input=synthesis_input,
-                voice=self.voice,
-                audio_config=self.audio_config
-            )
+    def stats(self) -> Dict:
+        """Upstream concurrency, coalescing and cache counters"""
+        return {
+            "executor": self.executor.stats(),
+            "requests": self._in_flight.stats(),
+            "cache": self.cache.stats() if self.cache is not None else None
+        }
 
-            return response.audio_content
+    def cache_key(self, kind: str, content: str) -> str:
+        """Cache key of an input under the current voice and audio config"""
+        return cache_key(kind, content, self.voice_params, self.audio_params)
 
-        except Exception as e:
-            print(f"Error in SSML synthesis: {e}")
+    def _synthesize(self, kind: str, content: str, timeout: Optional[float] = None) -> bytes:
+        """Blocking synthesis through the cache; runs in the TTS executor"""
+        if not self.client:
             return self.mock_synthesize()
 
+        key = self.cache_key(kind, content)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        if kind == "ssml":
+            synthesis_input = texttospeech.SynthesisInput(ssml=content)
+        else:
+            synthesis_input = texttospeech.SynthesisInput(text=content)
+
+        response = self.client.synthesize_speech(
+            input=synthesis_input,
+            voice=self.voice,
+            audio_config=self.audio_config,
+            timeout=timeout or self.request_timeout
+        )
+
+        if self.cache is not None:
+            self.cache.put(key, response.audio_content)
+        return response.audio_content
+
     def mock_synthesize(self) -> bytes:
         """Return mock audio data for testing"""
         # Return a minimal valid MP3 file
@@ -75,7 +234,16 @@ class TextToSpeech:
                        gender: str = "FEMALE",
                        speaking_rate: float = 0.9,
                        pitch: float = 0.0) -> None:
-        """Customize the voice parameters"""
+        """Customize the voice parameters
+
+        Cached audio is keyed on these parameters, so prompts synthesized with
+        the previous voice are never served for the new one. The voice is
+        checked against the voice catalog, raising ValueError if it does not
+        exist or does not speak the language.
+        """
+        if getattr(self, "client", None):
+            self.voice_catalog.validate(language_code, voice_name)
+
         gender_map = {
             "FEMALE": texttospeech.SsmlVoiceGender.FEMALE,
             "MALE": texttospeech.SsmlVoiceGender.MALE,
@@ -94,21 +262,32 @@ class TextToSpeech:
             pitch=pitch
         )
 
-    def get_available_voices(self) -> list:
-        """Get list of available voices"""
+        # Plain copies of every synthesis parameter, used for cache keys
+        self.voice_params = texttospeech.VoiceSelectionParams.to_dict(self.voice)
+        self.audio_params = texttospeech.AudioConfig.to_dict(self.audio_config)
+
+    def get_available_voices(self,
+                             language_code: Optional[str] = None,
+                             gender: Optional[str] = None) -> list:
+        """Get list of available voices, optionally filtered by language and gender"""
         try:
             if not self.client:
                 return []
-
-            voices = self.client.list_voices().voices
-            return [
-                {
-                    "name": voice.name,
-                    "language_codes": voice.language_codes,
-                    "gender": texttospeech.SsmlVoiceGender(voice.ssml_gender).name
-                }
-                for voice in voices
-            ]
+            return self.voice_catalog.find(language_code, gender)
         except Exception as e:
             print(f"Error getting available voices: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    def _list_voices(self) -> List[Dict]:
+        """Fetch the full voice list from the API"""
+        if not self.client:
+            raise RuntimeError("Text-to-speech client is not available")
+        voices = self.client.list_voices().voices
+        return [
+            {
+                "name": voice.name,
+                "language_codes": list(voice.language_codes),
+                "gender": texttospeech.SsmlVoiceGender(voice.ssml_gender).name
+            }
+            for voice in voices
+        ]
@@ -0,0 +1,58 @@
+import re
+from typing import Dict, List, Tuple
+
+
+class ToneRuleEngine:
+    """Phrase-based tone flags compiled into one regex and matched in a single scan
+
+    ``rules`` maps a flag (e.g. "Vague response") to the phrases that raise it.
+    All phrases from all rules are compiled once into a single alternation, so
+    adding phrases does not add passes over the transcript.
+    """
+
+    def __init__(self, rules: Dict[str, List[str]]):
+        self.flag_order = list(rules)
+        self._flags_by_phrase: Dict[str, List[str]] = {}
+        for flag, phrases in rules.items():
+            for phrase in phrases:
+                flags = self._flags_by_phrase.setdefault(self._normalize(phrase), [])
+                if flag not in flags:
+                    flags.append(flag)
+
+        # Longest phrases first so "kind of" wins over a shorter overlapping phrase
+        alternatives = sorted(self._flags_by_phrase, key=len, reverse=True)
+        self.pattern = re.compile(
+            r"(?<!\w)(?:" + "|".join(self._phrase_pattern(p) for p in alternatives) + r")(?!\w)",
+            re.IGNORECASE
+        ) if alternatives else None
+
+    @staticmethod
+    def _normalize(phrase: str) -> str:
+        return " ".join(phrase.lower().replace("’", "'").split())
+
+    @staticmethod
+    def _phrase_pattern(phrase: str) -> str:
+        # Any run of whitespace between words, straight or curly apostrophes
+        words = [re.escape(word).replace("'", "['’]") for word in phrase.split(" ")]
+        return r"\s+".join(words)
+
+    def scan(self, text: str) -> List[Dict]:
+        """Every rule match with its flag, matched phrase and character offsets"""
+        if self.pattern is None:
+            return []
+        matches = []
+        for match in self.pattern.finditer(text):
+            for flag in self._flags_by_phrase[self._normalize(match.group())]:
+                matches.append({
+                    "flag": flag,
+                    "phrase": match.group(),
+                    "start": match.start(),
+                    "end": match.end()
+                })
+        return matches
+
+    def flags(self, text: str) -> Tuple[List[str], List[Dict]]:
+        """Distinct flags raised by the text, in rule order, plus the matches"""
+        matches = self.scan(text)
+        raised = {match["flag"] for match in matches}
+        return [flag for flag in self.flag_order if flag in raised], matches
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+def cache_key(kind: str, content: str, voice: Dict, audio_config: Dict) -> str:
+    """Content address of a synthesis request
+
+    Covers the input kind (text or SSML), the input itself and every voice and
+    audio-config parameter, so changing any of them yields a different key.
+    """
+    payload = json.dumps(
+        {"kind": kind, "input": content, "voice": voice, "audio_config": audio_config},
+        sort_keys=True,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """Two-tier cache of synthesized audio: in-memory LRU over an on-disk store
+
+    Memory is bounded by entry count and total bytes. Disk entries are written
+    atomically under the content hash, so they survive restarts and can be
+    shared by every worker on the host.
+    """
+
+    def __init__(self,
+                 cache_dir: Optional[str] = None,
+                 max_entries: int = 256,
+                 max_bytes: int = 32 * 1024 * 1024,
+                 extension: str = "mp3"):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.extension = extension
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.{self.extension}")
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.hits["memory"] += 1
+                return audio
+
+        if self.cache_dir:
+            try:
+                with open(self._path(key), "rb") as f:
+                    audio = f.read()
+            except FileNotFoundError:
+                audio = None
+            except OSError as e:
+                print(f"Warning: Could not read TTS cache entry {key[:16]}: {e}")
+                audio = None
+            if audio:
+                self.hits["disk"] += 1
+                self._remember(key, audio)
+                return audio
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, audio: bytes) -> None:
+        """Cache ``audio``; a failed disk write (full disk, permissions) only skips the disk tier"""
+        self._remember(key, audio)
+        if not self.cache_dir:
+            return
+        temp_path = None
+        try:
+            # Write to a temp file and rename so readers never see partial audio
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+            os.replace(temp_path, self._path(key))
+        except OSError as e:
+            print(f"Warning: Could not write TTS cache entry {key[:16]}: {e}")
+            if temp_path is not None and os.path.exists(temp_path):
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+
+    def _remember(self, key: str, audio: bytes) -> None:
+        if len(audio) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous)
+            self._memory[key] = audio
+            self._memory_bytes += len(audio)
+            while len(self._memory) > self.max_entries or self._memory_bytes > self.max_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def clear(self, disk: bool = False) -> None:
+        """Drop the memory tier, and the disk tier too when ``disk`` is set"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        if disk and self.cache_dir:
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(f".{self.extension}"):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+    def stats(self) -> Dict:
+        return {
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "memory_hits": self.hits["memory"],
+            "disk_hits": self.hits["disk"],
+            "misses": self.misses
+        }
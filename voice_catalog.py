@@ -0,0 +1,140 @@
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+
+class VoiceCatalog:
+    """TTL-cached catalog of TTS voices, indexed by name, language and gender
+
+    ``fetch`` returns the full voice list (``name``, ``language_codes``,
+    ``gender``). The first lookup fetches it; afterwards lookups are served
+    from memory, and once the catalog is older than ``ttl`` seconds the stale
+    copy keeps being served while a background thread refreshes it.
+
+    Only one caller fetches the first copy; concurrent callers wait for it. A
+    failed fetch is not retried for ``retry_after`` seconds, so an unreachable
+    API does not add a blocking fetch to every lookup.
+    """
+
+    def __init__(self, fetch: Callable[[], List[Dict]], ttl: float = 86400.0, retry_after: float = 60.0):
+        self._fetch = fetch
+        self.ttl = ttl
+        self.retry_after = retry_after
+        self._voices: List[Dict] = []
+        self._by_name: Dict[str, Dict] = {}
+        self._by_language: Dict[str, List[Dict]] = {}
+        self._by_gender: Dict[str, List[Dict]] = {}
+        self._loaded_at: Optional[float] = None
+        self._failed_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._refreshing = False
+        self.fetches = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def _index(self, voices: List[Dict]) -> None:
+        by_name = {}
+        by_language: Dict[str, List[Dict]] = {}
+        by_gender: Dict[str, List[Dict]] = {}
+        for voice in voices:
+            by_name[voice["name"]] = voice
+            for code in voice["language_codes"]:
+                by_language.setdefault(code.lower(), []).append(voice)
+            by_gender.setdefault(voice["gender"], []).append(voice)
+        with self._lock:
+            self._voices = voices
+            self._by_name = by_name
+            self._by_language = by_language
+            self._by_gender = by_gender
+            self._loaded_at = time.monotonic()
+
+    def refresh(self) -> None:
+        """Fetch the catalog now; a failed fetch keeps the previous one"""
+        try:
+            voices = list(self._fetch())
+            self.fetches += 1
+            self.last_error = None
+            self._failed_at = None
+            self._index(voices)
+        except Exception as e:
+            self.last_error = str(e)
+            self._failed_at = time.monotonic()
+            print(f"Warning: Could not refresh voice catalog: {e}")
+        finally:
+            self._refreshing = False
+
+    def _backing_off(self) -> bool:
+        return self._failed_at is not None and time.monotonic() - self._failed_at < self.retry_after
+
+    def _ensure_fresh(self) -> None:
+        if self._loaded_at is None:
+            if self._backing_off():
+                return
+            with self._load_lock:
+                # Another caller may have fetched, or failed, while this one waited
+                if self._loaded_at is None and not self._backing_off():
+                    self.refresh()
+            return
+        if time.monotonic() - self._loaded_at < self.ttl or self._backing_off():
+            return
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self.refresh, name="voice-catalog-refresh", daemon=True).start()
+
+    def voices(self) -> List[Dict]:
+        self._ensure_fresh()
+        return list(self._voices)
+
+    def get(self, name: str) -> Optional[Dict]:
+        self._ensure_fresh()
+        return self._by_name.get(name)
+
+    def find(self, language_code: Optional[str] = None, gender: Optional[str] = None) -> List[Dict]:
+        """Voices matching a language code and/or gender"""
+        self._ensure_fresh()
+        if language_code is not None:
+            voices = self._by_language.get(language_code.lower(), [])
+            if gender is not None:
+                voices = [voice for voice in voices if voice["gender"] == gender]
+        elif gender is not None:
+            voices = self._by_gender.get(gender, [])
+        else:
+            voices = self._voices
+        return list(voices)
+
+    def validate(self, language_code: str, voice_name: str) -> None:
+        """Raise ValueError for a voice the API would reject
+
+        That is an unknown name or a language the voice does not speak; the
+        API picks the voice by name, so a differing gender is not an error.
+        Nothing is checked while the catalog is unavailable, so a failed fetch
+        never blocks configuration.
+        """
+        self._ensure_fresh()
+        if not self._by_name:
+            return
+        voice = self._by_name.get(voice_name)
+        if voice is None:
+            raise ValueError(f"Unknown voice: {voice_name}")
+        if language_code.lower() not in (code.lower() for code in voice["language_codes"]):
+            raise ValueError(
+                f"Voice {voice_name} does not support {language_code} "
+                f"(supports {', '.join(voice['language_codes'])})"
+            )
+
+    def stats(self) -> Dict:
+        return {
+            "voices": len(self._voices),
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+            "fetches": self.fetches,
+            "retry_in_seconds": (
+                round(self.retry_after - (time.monotonic() - self._failed_at), 1) if self._backing_off() else None
+            ),
+            "last_error": self.last_error
+        }